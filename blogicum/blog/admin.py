@@ -1,12 +1,141 @@
-from blog.models import Category, Comment, Location, Post
-from django.contrib import admin
+import time
+
+from blog import bulk
+from blog.models import Category, Comment, Location, Post, User
+from blog.paginators import EstimatedCountPaginator
+from blog.search import search_comments, search_posts
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Substr
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from django.utils.text import Truncator, capfirst
 
 admin.site.empty_value_display = 'Не задано'
 
+TEXT_PREVIEW_LENGTH = 50
+
+
+class TextPreviewChangeList(ChangeList):
+    """Список объектов, для которого из базы читается только начало текста."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text').annotate(
+            text_start=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1))
+
+
+def summarize_deletion(request, admin_site, querysets):
+    """
+    Сводка для страницы подтверждения удаления: количество объектов
+    каждой модели вместо полного дерева, которое собирает Collector,
+    загружая в память все связанные объекты.
+    """
+    model_count = {}
+    perms_needed = set()
+    for model, queryset in querysets:
+        count = queryset.count()
+        if not count:
+            continue
+        opts = model._meta
+        model_count[opts.verbose_name_plural] = count
+        model_admin = admin_site._registry.get(model)
+        if (model_admin is None
+                or not model_admin.has_delete_permission(request)):
+            perms_needed.add(opts.verbose_name)
+    to_delete = [
+        f'{capfirst(name)}: {count}' for name, count in model_count.items()]
+    return to_delete, model_count, perms_needed, []
+
+
+def report_timing(model_admin, request, message, started):
+    model_admin.message_user(
+        request, f'{message} Заняло {time.monotonic() - started:.2f} с.')
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Настройки списка для таблиц с большим числом строк:
+    без полного COUNT(*) на каждый запрос и без длинных текстов.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return TextPreviewChangeList
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        return Truncator(obj.text_start).chars(TEXT_PREVIEW_LENGTH)
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Встроенный список, который загружает только одну страницу объектов."""
+
+    per_page = 20
+    page_number = 1
+    page_param = 'page'
+    changelist_url = None
+
+    def get_queryset(self):
+        return self.page.object_list
+
+    @cached_property
+    def page(self):
+        queryset = self.queryset
+        if not queryset.ordered:
+            queryset = queryset.order_by('-pk')
+        return Paginator(queryset, self.per_page).get_page(self.page_number)
+
 
 class PostInline(admin.TabularInline):
+    """
+    Публикации категории или местоположения только для просмотра,
+    по странице за раз, со ссылкой на полный список публикаций.
+    """
+
     model = Post
+    formset = PaginatedInlineFormSet
+    template = 'admin/blog/paginated_inline.html'
+    fields = ('title', 'pub_date', 'is_published', 'author')
+    readonly_fields = fields
+    ordering = ('-pk',)
     extra = 0
+    can_delete = False
+    show_change_link = True
+    page_param = 'posts_page'
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        changelist_url = None
+        if obj is not None:
+            changelist_url = '{}?{}'.format(
+                reverse('admin:blog_post_changelist'),
+                urlencode({f'{formset.fk.name}__id__exact': obj.pk}))
+        return type(formset.__name__, (formset,), {
+            'page_number': request.GET.get(self.page_param),
+            'page_param': self.page_param,
+            'changelist_url': changelist_url,
+        })
 
 
 @admin.register(Category)
@@ -41,12 +170,17 @@ class LocationAdmin(admin.ModelAdmin):
     inlines = (PostInline,)
 
 
+class PostActionForm(helpers.ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label='Категория')
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'title',
         'created_at',
-        'text',
+        'text_preview',
         'pub_date',
         'is_published',
         'author',
@@ -56,6 +190,13 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
         'pub_date',
+    )
+    list_select_related = (
+        'author',
+        'location',
+        'category',
+    )
+    autocomplete_fields = (
         'author',
         'location',
         'category',
@@ -69,23 +210,154 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
     )
     list_display_links = ('title',)
+    action_form = PostActionForm
+    actions = ('publish', 'unpublish', 'move_to_category')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term, rank=False), False
+
+    @admin.action(description='Опубликовать выбранные публикации')
+    def publish(self, request, queryset):
+        started = time.monotonic()
+        count = bulk.set_published(queryset, True)
+        report_timing(
+            self, request, f'Опубликовано публикаций: {count}.', started)
+
+    @admin.action(description='Снять выбранные публикации с публикации')
+    def unpublish(self, request, queryset):
+        started = time.monotonic()
+        count = bulk.set_published(queryset, False)
+        report_timing(
+            self, request, f'Снято с публикации: {count}.', started)
+
+    @admin.action(description='Перенести выбранные публикации в категорию')
+    def move_to_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data['category'] is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR)
+            return
+        started = time.monotonic()
+        count = bulk.move_to_category(
+            queryset, form.cleaned_data['category'])
+        report_timing(
+            self, request, f'Перенесено публикаций: {count}.', started)
+
+    def get_deleted_objects(self, objs, request):
+        if not isinstance(objs, QuerySet):
+            return super().get_deleted_objects(objs, request)
+        return summarize_deletion(request, self.admin_site, (
+            (Post, objs),
+            (Comment, Comment.objects.filter(post__in=objs)),
+        ))
+
+    def delete_model(self, request, obj):
+        bulk.delete_comments(obj.comments.all())
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        bulk.delete_comments(Comment.objects.filter(post__in=queryset))
+        super().delete_queryset(request, queryset)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = (
         'post',
-        'text',
+        'text_preview',
         'author',
         'created_at',
     )
-    list_editable = (
-        'text',
+    list_select_related = (
+        'post',
+        'author',
+    )
+    autocomplete_fields = (
+        'post',
         'author',
     )
     search_fields = ('text',)
     list_filter = (
-        'author',
         'created_at',
     )
     list_display_links = ('post',)
+    actions = ('purge_author_comments',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_comments(queryset, search_term), False
+
+    @admin.action(description='Удалить все комментарии авторов выбранных')
+    def purge_author_comments(self, request, queryset):
+        started = time.monotonic()
+        # Авторов выбираем заранее: подзапрос по удаляемым комментариям
+        # опустел бы после первой пачки.
+        authors = list(
+            queryset.values_list('author_id', flat=True).distinct())
+        count = bulk.delete_comments(
+            Comment.objects.filter(author__in=authors))
+        report_timing(
+            self, request, f'Удалено комментариев: {count}.', started)
+
+    def get_deleted_objects(self, objs, request):
+        if not isinstance(objs, QuerySet):
+            return super().get_deleted_objects(objs, request)
+        return summarize_deletion(
+            request, self.admin_site, ((Comment, objs),))
+
+    def delete_queryset(self, request, queryset):
+        started = time.monotonic()
+        count = bulk.delete_comments(queryset)
+        report_timing(
+            self, request, f'Удалено комментариев: {count}.', started)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BlogUserAdmin(UserAdmin):
+    """
+    Пользователи удаляются вместе с комментариями пачками DELETE,
+    поэтому удаление автора сотен тысяч комментариев не загружает
+    их в память.
+    """
+
+    actions = ('purge_comments',)
+
+    def get_users(self, objs):
+        if isinstance(objs, QuerySet):
+            return objs
+        return User.objects.filter(pk__in=[obj.pk for obj in objs])
+
+    def get_user_comments(self, users):
+        return Comment.objects.filter(
+            Q(author__in=users) | Q(post__author__in=users))
+
+    @admin.action(description='Удалить все комментарии выбранных')
+    def purge_comments(self, request, queryset):
+        started = time.monotonic()
+        count = bulk.delete_comments(
+            Comment.objects.filter(author__in=queryset))
+        report_timing(
+            self, request, f'Удалено комментариев: {count}.', started)
+
+    def get_deleted_objects(self, objs, request):
+        users = self.get_users(objs)
+        return summarize_deletion(request, self.admin_site, (
+            (User, users),
+            (Post, Post.objects.filter(author__in=users)),
+            (Comment, self.get_user_comments(users)),
+        ))
+
+    def delete_model(self, request, obj):
+        bulk.delete_comments(self.get_user_comments(self.get_users([obj])))
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        bulk.delete_comments(self.get_user_comments(queryset))
+        super().delete_queryset(request, queryset)
@@ -0,0 +1,129 @@
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+
+from .conditional import conditional_page
+from .models import Comment, User
+from .paginators import CursorPaginator, get_published_category
+from .views import (get_category_validators, get_index_validators,
+                    get_post_validators, get_posts, get_profile_validators,
+                    get_visible_posts)
+
+API_PAGE_SIZE = 20
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'author': 'author__username',
+    'created_at': 'created_at',
+}
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('created_at', 'id')
+
+
+def get_requested_fields(request, fields):
+    """Поля из параметра ?fields=; неизвестные поля отбрасываются."""
+    requested = [
+        name for name in request.GET.get('fields', '').split(',')
+        if name in fields
+    ]
+    return requested or list(fields)
+
+
+def get_values(queryset, request, fields, ordering=()):
+    """
+    Выбирает из базы только запрошенные поля и поля сортировки,
+    не создавая экземпляры моделей.
+    """
+    names = get_requested_fields(request, fields)
+    lookups = {fields[name] for name in names}
+    lookups.update(field.lstrip('-') for field in ordering)
+    if 'location__name' in lookups:
+        lookups.add('location__is_published')
+    return queryset.values(*lookups), names
+
+
+def serialize(row, names, fields):
+    data = {name: row[fields[name]] for name in names}
+    if 'location' in data and not row['location__is_published']:
+        data['location'] = None
+    if 'image' in data:
+        data['image'] = (
+            default_storage.url(data['image']) if data['image'] else None)
+    return data
+
+
+def json_response(data):
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+
+def paginated_response(request, queryset, fields, ordering):
+    values, names = get_values(queryset, request, fields, ordering)
+    page = CursorPaginator(
+        values, API_PAGE_SIZE, ordering=ordering
+    ).get_page(request.GET.get('cursor'))
+    return json_response({
+        'results': [serialize(row, names, fields) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@require_safe
+@conditional_page(get_index_validators)
+def post_list(request):
+    return paginated_response(
+        request, get_posts(related=False, annotate=False),
+        POST_FIELDS, POST_ORDERING)
+
+
+@require_safe
+@conditional_page(get_category_validators)
+def category_post_list(request, category_slug):
+    category = get_published_category(category_slug)
+    return paginated_response(
+        request, get_posts(category.posts, related=False, annotate=False),
+        POST_FIELDS, POST_ORDERING)
+
+
+@require_safe
+@conditional_page(get_profile_validators)
+def profile_post_list(request, username):
+    author = get_object_or_404(User, username=username)
+    return paginated_response(
+        request,
+        get_posts(author.posts, related=False,
+                  filter=request.user != author, annotate=False),
+        POST_FIELDS, POST_ORDERING)
+
+
+@require_safe
+@conditional_page(get_post_validators)
+def post_detail(request, post_id):
+    values, names = get_values(
+        get_visible_posts(request.user).filter(pk=post_id),
+        request, POST_FIELDS)
+    return json_response(
+        serialize(get_object_or_404(values), names, POST_FIELDS))
+
+
+@require_safe
+@conditional_page(get_post_validators)
+def comment_list(request, post_id):
+    get_object_or_404(get_visible_posts(request.user).only('pk'),
+                      pk=post_id)
+    return paginated_response(
+        request, Comment.objects.filter(post=post_id),
+        COMMENT_FIELDS, COMMENT_ORDERING)
@@ -0,0 +1,146 @@
+from collections import defaultdict
+
+from django.db import router, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .counters import change_feed_counters, get_feed_deltas
+from .fragments import bump_versions
+from .models import Category, Comment, Post
+from .page_cache import get_post_page_tags, invalidate_pages
+from .paginators import (admin_counts, get_post_feed_keys,
+                         invalidate_feed_counts, next_publications)
+from .search import comment_index, remove_from_index
+
+BATCH_SIZE = 1000
+
+
+def iter_batches(queryset, fields, batch_size=None):
+    """
+    Строки queryset пачками по возрастанию ключа.
+    Каждая строка - кортеж (pk, *fields); в память попадает
+    не больше batch_size строк, по умолчанию BATCH_SIZE.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    queryset = queryset.order_by('pk').values_list('pk', *fields)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def invalidate_posts(rows):
+    """
+    Сбрасывает кеши после массового изменения публикаций.
+    rows - кортежи (pk, category_id, author_id).
+    """
+    if not rows:
+        return
+    feeds = {(category_id, author_id) for _, category_id, author_id in rows}
+    invalidate_feed_counts({
+        key for feed in feeds for key in get_post_feed_keys(*feed)})
+    invalidate_pages(*get_post_page_tags(
+        [pk for pk, _, _ in rows],
+        {category_id for category_id, _ in feeds},
+        {author_id for _, author_id in feeds},
+    ))
+    bump_versions(Post, [pk for pk, _, _ in rows])
+    next_publications.invalidate()
+    admin_counts.invalidate()
+
+
+def get_published_categories(category_ids):
+    return set(Category.objects.filter(
+        pk__in=set(category_ids) - {None}, is_published=True,
+    ).values_list('pk', flat=True))
+
+
+def set_published(queryset, is_published, batch_size=None):
+    """Публикует публикации queryset или снимает их с публикации."""
+    changed = 0
+    for rows in iter_batches(
+            queryset.exclude(is_published=is_published),
+            ('category_id', 'author_id'), batch_size):
+        published = get_published_categories(
+            category_id for _, category_id, _ in rows)
+        visible = [
+            (category_id, author_id, category_id in published)
+            for _, category_id, author_id in rows
+        ]
+        hidden = [
+            (category_id, author_id, False)
+            for _, category_id, author_id in rows
+        ]
+        removed, added = (
+            (hidden, visible) if is_published else (visible, hidden))
+        with transaction.atomic():
+            changed += Post.objects.filter(
+                pk__in=[pk for pk, _, _ in rows]
+            ).update(is_published=is_published, updated_at=timezone.now())
+            change_feed_counters(get_feed_deltas(removed, added))
+        invalidate_posts(rows)
+    return changed
+
+
+def move_to_category(queryset, category, batch_size=None):
+    """Переносит публикации queryset в категорию category."""
+    moved = 0
+    for rows in iter_batches(
+            queryset.exclude(category=category),
+            ('category_id', 'author_id', 'is_published'), batch_size):
+        published = get_published_categories(
+            category_id for _, category_id, _, _ in rows)
+        with transaction.atomic():
+            moved += Post.objects.filter(
+                pk__in=[pk for pk, _, _, _ in rows]
+            ).update(category=category, updated_at=timezone.now())
+            change_feed_counters(get_feed_deltas(
+                [
+                    (category_id, author_id,
+                     is_published and category_id in published)
+                    for _, category_id, author_id, is_published in rows
+                ],
+                [
+                    (category.pk, author_id,
+                     is_published and category.is_published)
+                    for _, _, author_id, is_published in rows
+                ],
+            ))
+        rows = [row[:3] for row in rows]
+        invalidate_posts(rows + [
+            (pk, category.pk, author_id) for pk, _, author_id in rows])
+    return moved
+
+
+def delete_comments(queryset, batch_size=None):
+    """
+    Удаляет комментарии queryset пачками DELETE без загрузки объектов
+    и сигналов, сохраняя счётчики комментариев, кеши и поисковый индекс.
+    """
+    deleted = 0
+    using = router.db_for_write(Comment)
+    for rows in iter_batches(queryset, ('post_id',), batch_size):
+        pks = [pk for pk, _ in rows]
+        comments_per_post = defaultdict(int)
+        for _, post_id in rows:
+            comments_per_post[post_id] += 1
+        posts_per_count = defaultdict(list)
+        for post_id, count in comments_per_post.items():
+            posts_per_count[count].append(post_id)
+        with transaction.atomic(using=using):
+            deleted += Comment.objects.filter(pk__in=pks)._raw_delete(using)
+            for count, post_ids in posts_per_count.items():
+                Post.objects.filter(pk__in=post_ids).update(
+                    comment_count=Greatest(F('comment_count') - count, 0),
+                    updated_at=timezone.now())
+            remove_from_index(comment_index, pks)
+        invalidate_posts(list(Post.objects.filter(
+            pk__in=comments_per_post).values_list(
+                'pk', 'category_id', 'author_id')))
+    return deleted
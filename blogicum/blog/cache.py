@@ -0,0 +1,145 @@
+import math
+import random
+import time
+
+from blogicum.routers import can_fill_caches
+from django.core.cache import caches
+
+
+def new_version():
+    return time.time_ns()
+
+
+class CacheNamespace:
+    """
+    Группа записей кеша с общим префиксом и версией.
+    Ключи имеют вид '<пространство>:<версия>:<части ключа>';
+    invalidate() меняет версию и разом делает устаревшими
+    все записи пространства.
+    get_or_set защищает от лавины пересчётов: значение считает
+    только процесс, взявший блокировку, остальные отдают прежнее
+    значение или ждут нового. Сразу после записи значения, прочитанные
+    с реплики, не сохраняются. Незадолго до истечения срока запись
+    с вероятностью, растущей по мере приближения к нему, пересчитывается
+    заранее, пока старое значение ещё в кеше.
+    """
+
+    lock_timeout = 10
+    wait_timeout = 5
+    wait_interval = 0.05
+    # Чем больше beta, тем раньше начинается досрочный пересчёт.
+    beta = 1.0
+
+    def __init__(self, name, alias='default'):
+        self.name = name
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return f'{self.name}:version'
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            version = new_version()
+            if not self.cache.add(self.version_key, version, None):
+                version = self.cache.get(self.version_key, version)
+        return version
+
+    def invalidate(self):
+        """Делает устаревшими все записи пространства."""
+        self.cache.set(self.version_key, new_version(), None)
+
+    def make_key(self, key, version=None):
+        parts = key if isinstance(key, tuple) else (key,)
+        if version is None:
+            version = self.get_version()
+        return ':'.join(map(str, (self.name, version, *parts)))
+
+    def get(self, key, default=None):
+        entry = self.cache.get(self.make_key(key))
+        return default if entry is None else entry[0]
+
+    def get_many(self, keys):
+        version = self.get_version()
+        cache_keys = {self.make_key(key, version): key for key in keys}
+        return {
+            cache_keys[cache_key]: entry[0]
+            for cache_key, entry in self.cache.get_many(cache_keys).items()
+        }
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(
+            self.make_key(key), self.make_entry(value, timeout), timeout)
+
+    def set_many(self, data, timeout=None):
+        version = self.get_version()
+        self.cache.set_many({
+            self.make_key(key, version): self.make_entry(value, timeout)
+            for key, value in data.items()
+        }, timeout)
+
+    def delete_many(self, keys):
+        version = self.get_version()
+        self.cache.delete_many(
+            [self.make_key(key, version) for key in keys])
+
+    def make_entry(self, value, timeout, compute_time=0):
+        expires_at = math.inf if timeout is None else time.time() + timeout
+        return value, expires_at, compute_time
+
+    def should_recompute(self, entry):
+        _, expires_at, compute_time = entry
+        if not compute_time or math.isinf(expires_at):
+            return False
+        early = -compute_time * self.beta * math.log(1 - random.random())
+        return time.time() + early >= expires_at
+
+    def wait_for(self, cache_key, lock_key):
+        """
+        Ждёт, пока держатель блокировки сохранит значение.
+        Если блокировка снята, а значения нет (вычисление упало
+        или результат не кешируется), ждать больше нечего.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.wait_interval)
+            entry = self.cache.get(cache_key)
+            if entry is not None or self.cache.get(lock_key) is None:
+                return entry
+        return None
+
+    def get_or_set(self, key, compute, timeout=None, cache_if=None):
+        """
+        Возвращает значение из кеша или вычисляет его через compute().
+        timeout может быть функцией от вычисленного значения;
+        cache_if решает, сохранять ли вычисленное значение.
+        """
+        cache_key = self.make_key(key)
+        entry = self.cache.get(cache_key)
+        if entry is not None and not self.should_recompute(entry):
+            return entry[0]
+        lock_key = f'{cache_key}:lock'
+        locked = self.cache.add(lock_key, 1, self.lock_timeout)
+        if not locked:
+            if entry is None:
+                entry = self.wait_for(cache_key, lock_key)
+            if entry is not None:
+                return entry[0]
+        try:
+            start = time.monotonic()
+            value = compute()
+            compute_time = time.monotonic() - start
+            if can_fill_caches() and (cache_if is None or cache_if(value)):
+                if callable(timeout):
+                    timeout = timeout(value)
+                self.cache.set(cache_key, self.make_entry(
+                    value, timeout, compute_time), timeout)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+        return value
@@ -0,0 +1,40 @@
+import hashlib
+
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+
+def conditional_page(get_validators):
+    """
+    Отвечает 304 на условные GET-запросы до выполнения представления.
+    get_validators получает аргументы представления и возвращает
+    словарь значений, от которых зависит страница, или None,
+    если страницу нельзя проверить.
+    """
+    def get_cached_validators(request, *args, **kwargs):
+        if not hasattr(request, '_page_validators'):
+            request._page_validators = get_validators(
+                request, *args, **kwargs)
+        return request._page_validators
+
+    def get_etag(request, *args, **kwargs):
+        validators = get_cached_validators(request, *args, **kwargs)
+        if validators is None:
+            return None
+        source = repr((request.user.pk, sorted(validators.items())))
+        return hashlib.md5(source.encode()).hexdigest()
+
+    def get_last_modified(request, *args, **kwargs):
+        validators = get_cached_validators(request, *args, **kwargs)
+        if validators is None:
+            return None
+        now = timezone.now()
+        return max(
+            (
+                value for value in validators.values()
+                if hasattr(value, 'utctimetuple') and value <= now
+            ),
+            default=None,
+        )
+
+    return condition(etag_func=get_etag, last_modified_func=get_last_modified)
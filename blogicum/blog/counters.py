@@ -0,0 +1,65 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import FeedCounter, Post
+from .paginators import get_counted_feed_keys, get_feed_posts
+
+
+def get_feed_deltas(removed=(), added=()):
+    """
+    Изменения счётчиков лент. removed и added - состояния публикаций
+    (category_id, author_id, visible) до и после записи.
+    """
+    deltas = Counter()
+    for state in removed:
+        deltas.subtract(get_counted_feed_keys(*state))
+    for state in added:
+        deltas.update(get_counted_feed_keys(*state))
+    return deltas
+
+
+def get_category_deltas(category, sign):
+    """
+    Изменения счётчиков лент, когда опубликованные публикации
+    категории становятся видимыми (sign=1) или скрытыми (sign=-1).
+    """
+    deltas = Counter()
+    for author_id, count in Post.objects.filter(
+            category=category, is_published=True).order_by().values(
+                'author_id').annotate(count=Count('pk')).values_list(
+                    'author_id', 'count'):
+        deltas.update({
+            key: sign * count
+            for key in get_counted_feed_keys(category.pk, author_id, True)
+            if not key.endswith(':all')
+        })
+    return deltas
+
+
+def change_feed_counters(deltas):
+    """
+    Прибавляет изменения к счётчикам лент одним UPDATE на каждую
+    величину изменения. Вызывается после записи публикаций: счётчики,
+    которых ещё нет, создаются с точным количеством публикаций.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        existing = set(FeedCounter.objects.filter(
+            key__in=deltas).values_list('key', flat=True))
+        keys_per_delta = defaultdict(list)
+        for key in existing:
+            keys_per_delta[deltas[key]].append(key)
+        for delta, keys in keys_per_delta.items():
+            FeedCounter.objects.filter(key__in=keys).update(
+                count=Greatest(F('count') + delta, 0),
+                updated_at=timezone.now())
+        FeedCounter.objects.bulk_create([
+            FeedCounter(key=key, count=get_feed_posts(key).count())
+            for key in deltas.keys() - existing
+        ], ignore_conflicts=True)
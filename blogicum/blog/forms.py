@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from django.core.validators import validate_image_file_extension
 
 from .models import Comment, Post, User
 
@@ -25,6 +26,13 @@ class EditProfileForm(forms.ModelForm):
 
 
 class PostForm(forms.ModelForm):
+    # Изображение декодируется фоновой задачей, а не при проверке формы.
+    image = forms.FileField(
+        label='Фото',
+        required=False,
+        validators=[validate_image_file_extension],
+    )
+
     class Meta:
         model = Post
         exclude = ('author',)
@@ -32,6 +40,13 @@ class PostForm(forms.ModelForm):
             'pub_date': forms.DateInput(attrs={'type': 'date'})
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        upload_error = getattr(image, 'upload_error', None)
+        if upload_error:
+            raise forms.ValidationError(upload_error)
+        return image
+
 
 class CommentForm(forms.ModelForm):
 
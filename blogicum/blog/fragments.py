@@ -0,0 +1,61 @@
+from blogicum.routers import can_fill_caches
+
+from .cache import CacheNamespace, new_version
+from .models import Category, Location, Post, User
+
+card_versions = CacheNamespace('card-version')
+
+
+def get_version_key(model, pk):
+    return model._meta.label_lower, pk
+
+
+def bump_version(instance):
+    """Помечает закешированные фрагменты объекта устаревшими."""
+    card_versions.set(
+        get_version_key(type(instance), instance.pk), new_version())
+
+
+def bump_versions(model, pks):
+    """Помечает устаревшими фрагменты нескольких объектов модели."""
+    version = new_version()
+    card_versions.set_many(
+        {get_version_key(model, pk): version for pk in pks})
+
+
+def get_card_version_keys(post):
+    return [
+        get_version_key(model, pk) if pk is not None else None
+        for model, pk in (
+            (Post, post.pk),
+            (Category, post.category_id),
+            (Location, post.location_id),
+            (User, post.author_id),
+        )
+    ]
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет публикациям версию карточки для кеша фрагментов.
+    Версия складывается из версий публикации, её категории,
+    местоположения и автора и читается из кеша одним запросом.
+    Пока реплика может отставать от записи, версии не ставятся
+    и карточки не кешируются.
+    """
+    posts = list(posts)
+    if not can_fill_caches():
+        for post in posts:
+            post.card_version = None
+        return posts
+    post_keys = {post: get_card_version_keys(post) for post in posts}
+    keys = {key for keys in post_keys.values() for key in keys if key}
+    versions = card_versions.get_many(keys)
+    missing = {key: new_version() for key in keys - versions.keys()}
+    if missing:
+        card_versions.set_many(missing)
+        versions.update(missing)
+    for post, keys in post_keys.items():
+        post.card_version = '.'.join(
+            str(versions[key]) if key else '0' for key in keys)
+    return posts
@@ -0,0 +1,105 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Post, PostImageRendition
+
+RENDITION_WIDTHS = {
+    PostImageRendition.CARD: 640,
+    PostImageRendition.DETAIL: 1280,
+    PostImageRendition.RETINA: 2560,
+}
+RENDITION_FORMATS = {
+    PostImageRendition.JPEG: (
+        'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    PostImageRendition.WEBP: ('WEBP', {'quality': 80, 'method': 4}),
+}
+REENCODED_FORMATS = {
+    'JPEG': {'quality': 95},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 95},
+}
+
+
+def strip_metadata(data):
+    """
+    Декодирует изображение, поворачивает его по EXIF
+    и перекодирует без метаданных.
+    Форматы не из REENCODED_FORMATS только проверяются и не меняются.
+    """
+    with Image.open(BytesIO(data)) as source:
+        source.load()
+        options = REENCODED_FORMATS.get(source.format)
+        if options is None:
+            return data
+        image = ImageOps.exif_transpose(source)
+        if source.format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(buffer, source.format, **options)
+    return buffer.getvalue()
+
+
+def render_renditions(data):
+    """
+    Готовит уменьшенные копии изображения.
+    Принимает байты исходного файла и возвращает список кортежей
+    (назначение, формат, байты), поэтому подходит для пула процессов.
+    """
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    renditions = []
+    for kind, width in RENDITION_WIDTHS.items():
+        resized = image
+        if image.width > width:
+            resized = image.resize(
+                (width, round(image.height * width / image.width)),
+                Image.LANCZOS)
+        for image_format, (pil_format, options) in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            renditions.append((kind, image_format, buffer.getvalue()))
+    return renditions
+
+
+def save_renditions(post, renditions):
+    post.renditions.all().delete()
+    created = []
+    for kind, image_format, data in renditions:
+        rendition = PostImageRendition(
+            post=post, kind=kind, format=image_format)
+        rendition.image.save(
+            f'{post.pk}_{kind}.{image_format}', ContentFile(data), save=False)
+        rendition.save()
+        created.append(rendition)
+    return created
+
+
+def process_post_image(post_id):
+    """
+    Фоновая задача обработки загруженного изображения публикации.
+    Удаляет метаданные и создаёт уменьшенные копии; файл,
+    который не читается как изображение, удаляется из публикации.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None:
+        return
+    if post.image:
+        name = post.image.name
+        with post.image.open('rb') as image_file:
+            data = image_file.read()
+        try:
+            data = strip_metadata(data)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            post.image = ''
+            post.renditions.all().delete()
+        else:
+            post.image.save(
+                os.path.basename(name), ContentFile(data), save=False)
+            save_renditions(post, render_renditions(data))
+    else:
+        post.renditions.all().delete()
+    post.image_processing = False
+    post.save(update_fields=('image', 'image_processing', 'updated_at'))
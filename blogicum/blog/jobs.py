@@ -0,0 +1,88 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def enqueue(func, **kwargs):
+    """
+    Ставит вызов функции в очередь фоновых задач.
+    Аргументы должны сериализоваться в JSON. При JOBS_RUN_INLINE
+    задача выполняется сразу, без отдельного обработчика.
+    """
+    job = Job.objects.create(
+        task=f'{func.__module__}.{func.__qualname__}', kwargs=kwargs)
+    if settings.JOBS_RUN_INLINE:
+        run_job(job)
+    return job
+
+
+def claim_job():
+    """
+    Забирает из очереди следующую задачу.
+    Задача считается захваченной, если условный UPDATE изменил строку,
+    поэтому несколько обработчиков не выполнят её дважды.
+    Задачи, зависшие в работе дольше JOBS_LOCK_TIMEOUT, выдаются снова.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    available = (
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    )
+    while True:
+        job = Job.objects.filter(available).order_by('id').first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(
+            available, pk=job.pk, status=job.status
+        ).update(status=Job.RUNNING, locked_at=now,
+                 attempts=job.attempts + 1)
+        if claimed:
+            job.status = Job.RUNNING
+            job.locked_at = now
+            job.attempts += 1
+            return job
+
+
+def run_job(job):
+    """
+    Выполняет задачу. При ошибке задача возвращается в очередь
+    с задержкой, пока не исчерпано JOBS_MAX_ATTEMPTS попыток.
+    """
+    if job.status != Job.RUNNING:
+        job.attempts += 1
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < settings.JOBS_MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * job.attempts)
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.DONE
+        job.error = ''
+    job.locked_at = None
+    job.save(update_fields=(
+        'status', 'attempts', 'error', 'run_after', 'locked_at'))
+    return job
+
+
+def run_pending(limit=None):
+    """Выполняет задачи из очереди, пока она не опустеет."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,31 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истёкшие сессии из базы небольшими пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество сессий, удаляемых одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write('Сессии хранятся не в базе, удалять нечего.')
+            return
+        sessions = store.get_model_class().objects.filter(
+            expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(
+                sessions.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += sessions.filter(session_key__in=keys).delete()[0]
+        self.stdout.write(f'Удалено сессий: {deleted}')
@@ -0,0 +1,75 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from blog.models import Post, PostImageRendition, StoredFile
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы изображений, на которые не ссылаются публикации.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+        parser.add_argument(
+            '--grace', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд: они могут'
+                 ' принадлежать ещё не сохранённой публикации.'
+        )
+
+    def recount(self):
+        refcount = Subquery(
+            Post.objects.filter(image=OuterRef('name'))
+            .order_by().values('image')
+            .annotate(count=Count('pk')).values('count')
+        )
+        StoredFile.objects.update(refcount=Coalesce(refcount, Value(0)))
+
+    def handle(self, *args, dry_run, grace, **options):
+        if not dry_run:
+            self.recount()
+        storage = Post._meta.get_field('image').storage
+        root = Post._meta.get_field('image').upload_to
+        referenced = set(
+            StoredFile.objects.filter(refcount__gt=0)
+            .values_list('name', flat=True))
+        referenced.update(
+            Post.objects.exclude(image='').values_list('image', flat=True))
+        referenced.update(
+            PostImageRendition.objects.values_list('image', flat=True))
+        deadline = timezone.now() - timedelta(seconds=grace)
+        names = walk(storage, root) if storage.exists(root) else ()
+        garbage = [
+            name for name in names
+            if name not in referenced
+            and storage.get_modified_time(name) < deadline
+        ]
+        total_size = 0
+        for name in garbage:
+            size = storage.size(name)
+            total_size += size
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name} ({filesizeformat(size)})')
+            if not dry_run:
+                storage.delete(name)
+        if not dry_run:
+            StoredFile.objects.filter(name__in=garbage).delete()
+        action = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(
+            f'{action} файлов: {len(garbage)}, '
+            f'{filesizeformat(total_size)}')
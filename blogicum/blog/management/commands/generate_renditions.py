@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.images import render_renditions, save_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов для обработки изображений.'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для публикаций, у которых они уже есть.'
+        )
+
+    def handle(self, *args, workers, all, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        if not all:
+            posts = posts.filter(renditions__isnull=True)
+        batch_size = workers * 4
+        processed = 0
+        failed = 0
+        last_id = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = list(posts.filter(pk__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].pk
+                futures = {}
+                for post in batch:
+                    try:
+                        with post.image.open('rb') as image_file:
+                            data = image_file.read()
+                    except OSError as error:
+                        failed += 1
+                        self.stderr.write(f'Публикация {post.pk}: {error}')
+                        continue
+                    futures[post] = executor.submit(render_renditions, data)
+                for post, future in futures.items():
+                    try:
+                        renditions = future.result()
+                    except Exception as error:
+                        failed += 1
+                        self.stderr.write(f'Публикация {post.pk}: {error}')
+                        continue
+                    with transaction.atomic():
+                        save_renditions(post, renditions)
+                        post.save(update_fields=('updated_at',))
+                    processed += 1
+        self.stdout.write(
+            f'Обработано изображений: {processed}, с ошибками: {failed}')
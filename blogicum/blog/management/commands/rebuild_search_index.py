@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import BATCH_SIZE, INDEXES, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество объектов, индексируемых за один проход.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        for index in INDEXES:
+            with transaction.atomic():
+                indexed = rebuild_index(index, batch_size=batch_size)
+            self.stdout.write(f'{index.model}: проиндексировано {indexed}')
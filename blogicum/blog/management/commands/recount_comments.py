@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество публикаций, обновляемых одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        comment_count = Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post')
+            .annotate(count=Count('pk')).values('count')
+        )
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                Post.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += Post.objects.filter(
+                    pk__gt=last_id, pk__lte=ids[-1]
+                ).update(
+                    comment_count=Coalesce(comment_count, Value(0)))
+            last_id = ids[-1]
+        self.stdout.write(f'Обновлено публикаций: {updated}')
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить накопившиеся задачи и завершить работу.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help='Завершить работу после выполнения стольких задач.'
+        )
+
+    def handle(self, *args, once, sleep, max_jobs, **options):
+        processed = 0
+        try:
+            while max_jobs is None or processed < max_jobs:
+                limit = None if max_jobs is None else max_jobs - processed
+                done = run_pending(limit)
+                processed += done
+                if once:
+                    break
+                if not done:
+                    time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Выполнено задач: {processed}')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import PublicationScheduler
+
+
+class Command(BaseCommand):
+    help = 'Объявляет отложенные публикации в момент их публикации.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Объявить наступившие публикации и завершить работу.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60.0,
+            help='Наибольшая пауза в секундах между проверками:'
+                 ' не позже этого публикация будет объявлена, даже если'
+                 ' у планировщика и сайта разные кеши.'
+        )
+
+    def handle(self, *args, once, max_sleep, **options):
+        scheduler = PublicationScheduler()
+        announced = 0
+        try:
+            while True:
+                announced += scheduler.tick()
+                if once:
+                    break
+                scheduler.wait(max_sleep)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Опубликовано по расписанию: {announced}')
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Comment = apps.get_model('blog', 'Comment')
+    Post = apps.get_model('blog', 'Post')
+    comment_count = models.Subquery(
+        Comment.objects.filter(post=models.OuterRef('pk'))
+        .order_by().values('post')
+        .annotate(count=models.Count('pk')).values('count')
+    )
+    Post.objects.update(
+        comment_count=Coalesce(
+            comment_count, models.Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0005_comment'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'default_related_name': 'comments', 'ordering': ('created_at',), 'verbose_name': 'комментарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'default_related_name': 'posts', 'ordering': ('-pub_date',), 'verbose_name': 'публикация', 'verbose_name_plural': 'Публикации'},
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Создан'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='blog.post', verbose_name='Пост'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='text',
+            field=models.TextField(verbose_name='Текст'),
+        ),
+        migrations.RunPython(
+            fill_comment_count, migrations.RunPython.noop),
+    ]
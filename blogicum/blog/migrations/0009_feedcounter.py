@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_feed_indexes_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Лента')),
+                ('count', models.PositiveIntegerField(verbose_name='Количество публикаций')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'счётчик ленты',
+                'verbose_name_plural': 'Счётчики лент',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('card', 'Карточка в ленте'), ('detail', 'Страница публикации'), ('retina', 'Экран высокой плотности')], max_length=16, verbose_name='Назначение')),
+                ('format', models.CharField(choices=[('jpeg', 'JPEG'), ('webp', 'WebP')], max_length=8, verbose_name='Формат')),
+                ('image', models.ImageField(height_field='height', upload_to='post_images/renditions', verbose_name='Изображение', width_field='width')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'копия изображения',
+                'verbose_name_plural': 'Копии изображений',
+                'ordering': ('width',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postimagerendition',
+            constraint=models.UniqueConstraint(fields=('post', 'kind', 'format'), name='unique_post_image_rendition'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_postimagerendition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=256, verbose_name='Задача')),
+                ('kwargs', models.JSONField(default=dict, verbose_name='Аргументы')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Выполнена'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Выполнить после')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_processing',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Изображение обрабатывается'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after', 'id'], name='job_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:18
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='post_images', verbose_name='Фото'),
+        ),
+    ]
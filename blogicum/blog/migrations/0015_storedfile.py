@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+def fill_stored_files(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    StoredFile = apps.get_model('blog', 'StoredFile')
+    StoredFile.objects.bulk_create(
+        StoredFile(name=row['image'], refcount=row['refcount'])
+        for row in Post.objects.exclude(image='').order_by()
+        .values('image').annotate(refcount=models.Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Имя файла')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'файл',
+                'verbose_name_plural': 'Файлы',
+            },
+        ),
+        migrations.RunPython(fill_stored_files, migrations.RunPython.noop),
+    ]
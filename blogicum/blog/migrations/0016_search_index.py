@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from blog.search import INDEXES, create_index, drop_index, rebuild_index
+
+
+def create_search_index(apps, schema_editor):
+    for index in INDEXES:
+        create_index(index, schema_editor.connection)
+        rebuild_index(
+            index, model=apps.get_model(index.model),
+            using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    for index in INDEXES:
+        drop_index(index, schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_storedfile'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Планировщик')),
+                ('position', models.DateTimeField(verbose_name='Обработано до')),
+            ],
+            options={
+                'verbose_name': 'состояние планировщика',
+                'verbose_name_plural': 'Состояния планировщика',
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -7,7 +10,7 @@ User = get_user_model()
 class PublishedModel(models.Model):
     """
     Абстрактная базовая модель.
-    Добавляет поля 'is_published' и 'created_at'
+    Добавляет поля 'is_published', 'created_at' и 'updated_at'
     """
 
     is_published = models.BooleanField(
@@ -17,6 +20,7 @@ class PublishedModel(models.Model):
     )
 
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -78,13 +82,44 @@ class Post(PublishedModel):
         null=True,
         verbose_name='Категория',
     )
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='post_images',
+        storage=ContentAddressedStorage(),
+        blank=True,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_processing = models.BooleanField(
+        'Изображение обрабатывается',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:20]
@@ -109,6 +144,159 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:20]
+
+
+class FeedCounter(models.Model):
+    """
+    Количество публикаций ленты вместе с отложенными.
+    Используется пагинатором в режиме приблизительного подсчёта
+    и обновляется сигналами и массовыми действиями при записи.
+    """
+
+    key = models.CharField('Лента', max_length=64, unique=True)
+    count = models.PositiveIntegerField('Количество публикаций')
+    updated_at = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'счётчик ленты'
+        verbose_name_plural = 'Счётчики лент'
+
+    def __str__(self):
+        return f'{self.key}: {self.count}'
+
+
+class PostImageRendition(models.Model):
+    """Уменьшенная копия изображения публикации."""
+
+    CARD = 'card'
+    DETAIL = 'detail'
+    RETINA = 'retina'
+    KIND_CHOICES = (
+        (CARD, 'Карточка в ленте'),
+        (DETAIL, 'Страница публикации'),
+        (RETINA, 'Экран высокой плотности'),
+    )
+    JPEG = 'jpeg'
+    WEBP = 'webp'
+    FORMAT_CHOICES = (
+        (JPEG, 'JPEG'),
+        (WEBP, 'WebP'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='renditions',
+        verbose_name='Публикация',
+    )
+    kind = models.CharField('Назначение', max_length=16, choices=KIND_CHOICES)
+    format = models.CharField('Формат', max_length=8, choices=FORMAT_CHOICES)
+    image = models.ImageField(
+        'Изображение',
+        upload_to='post_images/renditions',
+        width_field='width',
+        height_field='height',
+    )
+    width = models.PositiveIntegerField('Ширина')
+    height = models.PositiveIntegerField('Высота')
+
+    class Meta:
+        verbose_name = 'копия изображения'
+        verbose_name_plural = 'Копии изображений'
+        ordering = ('width',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'kind', 'format'),
+                name='unique_post_image_rendition',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.kind} {self.format}'
+
+
+class StoredFile(models.Model):
+    """
+    Файл в хранилище по содержимому.
+    refcount — количество публикаций, которые на него ссылаются;
+    файлы без ссылок удаляет команда gc_images.
+    """
+
+    name = models.CharField('Имя файла', max_length=100, unique=True)
+    refcount = models.PositiveIntegerField('Количество ссылок', default=0)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return f'{self.name}: {self.refcount}'
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди на базе таблицы.
+    Задачи выполняет команда run_jobs.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField('Задача', max_length=256)
+    kwargs = models.JSONField('Аргументы', default=dict)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('id',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after', 'id'),
+                name='job_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.task} ({self.status})'
+
+
+class SchedulerState(models.Model):
+    """
+    Отметка времени, до которого планировщик уже объявил
+    отложенные публикации видимыми.
+    """
+
+    name = models.CharField('Планировщик', max_length=64, unique=True)
+    position = models.DateTimeField('Обработано до')
+
+    class Meta:
+        verbose_name = 'состояние планировщика'
+        verbose_name_plural = 'Состояния планировщика'
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
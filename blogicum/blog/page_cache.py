@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .cache import CacheNamespace, new_version
+from .models import Category, User
+from .paginators import get_publication_timeout
+
+CONTENT_TAG = 'content'
+
+page_tags = CacheNamespace('page-tag')
+pages = CacheNamespace('page')
+
+
+def get_tag_versions(tags):
+    versions = page_tags.get_many(tags)
+    missing = {tag: new_version() for tag in tags if tag not in versions}
+    if missing:
+        page_tags.set_many(missing)
+        versions.update(missing)
+    return [versions[tag] for tag in tags]
+
+
+def get_tags_modified_at(tags):
+    """
+    Время последнего сброса страниц с любым из тегов.
+    Версия тега - метка времени в наносекундах, поэтому она же
+    служит датой изменения страниц.
+    """
+    return datetime.fromtimestamp(
+        max(get_tag_versions(tags)) / 10 ** 9, timezone.utc)
+
+
+def invalidate_pages(*tags):
+    """Сбрасывает закешированные страницы, зависящие от тегов."""
+    page_tags.set_many({tag: new_version() for tag in tags})
+
+
+def get_post_page_tags(post_ids=(), category_ids=(), author_ids=()):
+    """Теги страниц, на которых показываются публикации."""
+    tags = {'feed:global'}
+    tags.update(f'post:{post_id}' for post_id in post_ids)
+    category_ids = set(category_ids) - {None}
+    if category_ids:
+        tags.update(
+            f'feed:category:{slug}' for slug in Category.objects.filter(
+                pk__in=category_ids).values_list('slug', flat=True))
+    author_ids = set(author_ids) - {None}
+    if author_ids:
+        tags.update(
+            f'feed:author:{username}' for username in User.objects.filter(
+                pk__in=author_ids).values_list('username', flat=True))
+    return tags
+
+
+def cache_anonymous_page(*tags, scheduled=None):
+    """
+    Кеширует страницу для анонимных пользователей.
+    Теги и условия отложенных публикаций ленты задаются строками
+    формата, в которые подставляются именованные аргументы представления.
+    Страница сбрасывается при смене версии любого из тегов
+    или общего тега содержимого. На условные запросы к закешированной
+    странице отвечает 304 по её ETag и Last-Modified.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            tags_for_page = [CONTENT_TAG] + [
+                tag.format(**kwargs) for tag in tags]
+            path_hash = hashlib.md5(
+                request.get_full_path().encode()).hexdigest()
+            versions = '.'.join(map(str, get_tag_versions(tags_for_page)))
+            computed = []
+
+            def render_page():
+                response = view(request, *args, **kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response.render()
+                computed.append(response)
+                return response
+
+            def get_timeout(response):
+                lookups = None if scheduled is None else {
+                    lookup: value.format(**kwargs)
+                    for lookup, value in scheduled.items()
+                }
+                return get_publication_timeout(
+                    settings.PAGE_CACHE_TIMEOUT, lookups)
+
+            response = pages.get_or_set(
+                (path_hash, versions), render_page, timeout=get_timeout,
+                cache_if=lambda response: (
+                    response.status_code == 200 and not response.cookies),
+            )
+            if computed and response is computed[0]:
+                return response
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')),
+                response=response,
+            )
+        return wrapper
+    return decorator
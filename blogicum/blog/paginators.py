@@ -0,0 +1,373 @@
+import binascii
+import hashlib
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Min, Q
+from django.http import Http404
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .cache import CacheNamespace
+from .models import Category, FeedCounter, Post
+
+feed_counts = CacheNamespace('feed-count')
+admin_counts = CacheNamespace('admin-count')
+next_publications = CacheNamespace('next-publication')
+categories = CacheNamespace('category')
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    """Страница ленты, выбранная по курсору, без OFFSET и COUNT(*)."""
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинатор по ключу сортировки.
+    Каждая страница выбирается одним запросом с LIMIT per_page + 1,
+    поэтому её стоимость не зависит от глубины листания.
+    Работает и с .values(), если поля сортировки есть в выборке,
+    и с аннотациями, например с оценкой релевантности поиска.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        descending = {field.startswith('-') for field in ordering}
+        if len(descending) != 1:
+            raise ValueError(
+                'Все поля сортировки должны иметь одно направление.')
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.descending = descending.pop()
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+
+    def _model_field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, obj, reverse=False):
+        values = [
+            obj[field] if isinstance(obj, dict) else getattr(obj, field)
+            for field in self.fields
+        ]
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+        return urlsafe_b64encode(json.dumps(
+            {'v': values, 'r': reverse}
+        ).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(
+                urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if len(data['v']) != len(self.fields):
+                raise ValueError('Неверное количество значений курсора.')
+            values = [
+                self._model_field(field).to_python(value)
+                for field, value in zip(self.fields, data['v'])
+            ]
+            return values, bool(data['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError,
+                ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+
+    def _seek(self, values, after):
+        lookup = 'lt' if self.descending == after else 'gt'
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            condition |= Q(
+                **dict(zip(self.fields[:position], values[:position])),
+                **{f'{field}__{lookup}': values[position]}
+            )
+        return self.queryset.filter(condition)
+
+    def page(self, cursor=None):
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = self._seek(values, after=not reverse)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            )
+        objects = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse:
+            objects.reverse()
+        if not objects:
+            return CursorPage(objects, self)
+        has_next = has_more if not reverse else True
+        has_previous = bool(cursor) if not reverse else has_more
+        return CursorPage(
+            objects, self,
+            next_cursor=(
+                self.encode_cursor(objects[-1]) if has_next else None),
+            previous_cursor=(
+                self.encode_cursor(objects[0], reverse=True)
+                if has_previous else None),
+        )
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+def get_feed_key(category=None, author=None, published_only=True):
+    if category is not None:
+        return f'category:{category.pk}'
+    if author is not None:
+        return f'author:{author.pk}' + ('' if published_only else ':all')
+    return 'global'
+
+
+def get_post_feed_keys(category_id, author_id):
+    """Ключи лент, в которые может попасть публикация."""
+    keys = ['global', f'author:{author_id}', f'author:{author_id}:all']
+    if category_id is not None:
+        keys.append(f'category:{category_id}')
+    return keys
+
+
+def get_counted_feed_keys(category_id, author_id, visible):
+    """
+    Ключи счётчиков лент, в которые входит публикация.
+    visible - опубликованы ли публикация и её категория; время
+    публикации не учитывается: счётчик включает отложенные публикации,
+    а пагинатор вычитает их при чтении.
+    """
+    keys = [f'author:{author_id}:all']
+    if visible:
+        keys += ['global', f'author:{author_id}', f'category:{category_id}']
+    return keys
+
+
+def get_feed_posts(feed_key):
+    """Публикации, которые учитывает счётчик ленты, вместе с отложенными."""
+    lookups = get_feed_lookups(feed_key)
+    if lookups is None:
+        author_id = feed_key.split(':')[1]
+        return Post.objects.filter(author_id=author_id)
+    return Post.objects.filter(
+        is_published=True, category__is_published=True, **lookups)
+
+
+def get_feed_lookups(feed_key):
+    """
+    Условия отбора публикаций ленты для поиска отложенных публикаций.
+    Для ленты автора со всеми публикациями возвращает None.
+    """
+    kind, _, value = feed_key.partition(':')
+    if value.endswith(':all'):
+        return None
+    if kind == 'category':
+        return {'category_id': value}
+    if kind == 'author':
+        return {'author_id': value}
+    return {}
+
+
+def get_next_publication(lookups):
+    """
+    Время ближайшей отложенной публикации среди публикаций,
+    отобранных условиями lookups, или None.
+    Значение кешируется до этого времени и сбрасывается при изменении
+    публикаций и планировщиком, когда публикация становится видимой.
+    """
+    def compute():
+        return Post.objects.filter(
+            is_published=True, pub_date__gt=timezone.now(), **lookups
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+    def get_timeout(next_pub_date):
+        if next_pub_date is None:
+            return settings.NEXT_PUBLICATION_CACHE_TIMEOUT
+        seconds = (next_pub_date - timezone.now()).total_seconds()
+        return max(1, min(
+            settings.NEXT_PUBLICATION_CACHE_TIMEOUT, math.ceil(seconds)))
+
+    key = ','.join(
+        f'{lookup}={value}' for lookup, value in sorted(lookups.items()))
+    return next_publications.get_or_set(
+        key or 'all', compute, timeout=get_timeout)
+
+
+def get_publication_timeout(timeout, lookups):
+    """
+    Сокращает время жизни записи кеша до ближайшей отложенной
+    публикации среди публикаций, отобранных условиями lookups.
+    """
+    if lookups is None:
+        return timeout
+    next_pub_date = get_next_publication(lookups)
+    if next_pub_date is None:
+        return timeout
+    seconds = (next_pub_date - timezone.now()).total_seconds()
+    return max(1, min(timeout, math.ceil(seconds)))
+
+
+def get_published_category(slug):
+    """
+    Опубликованная категория по слагу из кеша.
+    Кеш сбрасывается сигналами при изменении любой категории.
+    """
+    category = categories.get_or_set(
+        slug,
+        lambda: Category.objects.filter(
+            slug=slug, is_published=True).first() or False,
+        timeout=settings.CATEGORY_CACHE_TIMEOUT,
+    )
+    if not category:
+        raise Http404('Категория не найдена.')
+    return category
+
+
+def invalidate_feed_counts(feed_keys=None):
+    """
+    Сбрасывает сохранённые количества публикаций лент.
+    Без аргументов сбрасывает количества всех лент.
+    """
+    if feed_keys is None:
+        feed_counts.invalidate()
+        return
+    feed_counts.delete_many(feed_keys)
+
+
+class FeedPaginator(Paginator):
+    """
+    Пагинатор ленты, который берёт количество публикаций из кеша.
+    Запись кеша живёт до ближайшей отложенной публикации ленты
+    и сбрасывается сигналами при изменении публикаций и категорий.
+    """
+
+    def __init__(self, object_list, per_page, feed_key, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed_key = feed_key
+
+    @cached_property
+    def count(self):
+        return feed_counts.get_or_set(
+            self.feed_key, self.get_count,
+            timeout=lambda count: self.get_count_timeout())
+
+    def get_count(self):
+        if settings.FEED_APPROXIMATE_COUNT:
+            return self.get_approximate_count()
+        return super().count
+
+    def get_count_timeout(self):
+        return get_publication_timeout(
+            settings.FEED_COUNT_CACHE_TIMEOUT,
+            get_feed_lookups(self.feed_key))
+
+    def get_approximate_count(self):
+        """
+        Оценка количества из плана запроса PostgreSQL.
+        В остальных базах количество берётся из счётчика ленты
+        за вычетом отложенных публикаций; пока счётчика нет,
+        публикации считаются точно.
+        """
+        queryset = self.object_list.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return self.get_counter_count(queryset)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_counter_count(self, queryset):
+        count = FeedCounter.objects.filter(
+            key=self.feed_key).values_list('count', flat=True).first()
+        if count is None:
+            return queryset.count()
+        if get_feed_lookups(self.feed_key) is None:
+            return count
+        scheduled = get_feed_posts(self.feed_key).filter(
+            pub_date__gt=timezone.now()).count()
+        return max(count - scheduled, 0)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки без точного COUNT(*) на каждый запрос.
+    Для больших таблиц без фильтров в PostgreSQL количество берётся
+    из статистики планировщика, остальные количества кешируются
+    на ADMIN_COUNT_CACHE_TIMEOUT секунд и сбрасываются сигналами
+    и массовыми действиями при изменении публикаций и комментариев.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        estimate = self.get_estimate(queryset)
+        if estimate is not None:
+            return estimate
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        return admin_counts.get_or_set(
+            (queryset.db, hashlib.md5(sql.encode()).hexdigest()),
+            queryset.count,
+            timeout=settings.ADMIN_COUNT_CACHE_TIMEOUT,
+        )
+
+    def get_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row is None or row[0] < settings.ADMIN_ESTIMATED_COUNT_MIN:
+            return None
+        return int(row[0])
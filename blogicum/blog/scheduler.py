@@ -0,0 +1,109 @@
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE
+from .models import Post, SchedulerState
+from .paginators import get_next_publication
+
+# Отправляется, когда наступило время отложенных публикаций.
+# Аргумент rows - кортежи (pk, category_id, author_id).
+post_became_visible = Signal()
+
+
+class PublicationScheduler:
+    """
+    Объявляет отложенные публикации видимыми в момент наступления
+    pub_date: отправляет сигнал post_became_visible, по которому
+    сбрасываются кеши лент и страниц.
+    Время, до которого публикации уже объявлены, хранится в базе
+    и продвигается после каждой отправленной пачки, поэтому после
+    сбоя или перезапуска публикации не теряются. Последняя
+    публикация пачки, на которой произошёл сбой, может быть объявлена
+    повторно; это безвредно, сигнал только сбрасывает кеши.
+    clock заменяет timezone.now в тестах.
+    """
+
+    name = 'publication'
+    batch_size = BATCH_SIZE
+    poll_interval = 1
+
+    def __init__(self, clock=None):
+        self.clock = clock
+
+    def now(self):
+        return self.clock() if self.clock else timezone.now()
+
+    def next_run(self):
+        """
+        Время ближайшей отложенной публикации или None.
+        Берётся из кеша, который сбрасывают сигналы публикаций.
+        """
+        return get_next_publication({})
+
+    def get_sleep(self, max_sleep):
+        """Сколько секунд можно ждать до следующего запуска."""
+        next_run = self.next_run()
+        if next_run is None:
+            return max_sleep
+        seconds = (next_run - self.now()).total_seconds()
+        return min(max_sleep, max(seconds, 0))
+
+    def wait(self, max_sleep):
+        """
+        Ждёт ближайшей публикации, но не дольше max_sleep секунд.
+        Время публикации перечитывается каждые poll_interval секунд,
+        поэтому публикация, отложенная во время ожидания, объявляется
+        вовремя, если кеш общий с процессами сайта, и не позже
+        чем через max_sleep секунд в любом случае.
+        """
+        deadline = time.monotonic() + max_sleep
+        while True:
+            sleep = self.get_sleep(deadline - time.monotonic())
+            if sleep <= 0:
+                return
+            time.sleep(min(sleep, self.poll_interval))
+
+    def get_batch(self, position, now, last):
+        posts = Post.objects.filter(
+            is_published=True, pub_date__gt=position, pub_date__lte=now)
+        if last is not None:
+            last_pub_date, last_pk = last
+            posts = posts.filter(
+                Q(pub_date__gt=last_pub_date)
+                | Q(pub_date=last_pub_date, pk__gt=last_pk))
+        return list(posts.order_by('pub_date', 'pk').values_list(
+            'pk', 'category_id', 'author_id', 'pub_date'
+        )[:self.batch_size])
+
+    def tick(self):
+        """
+        Объявляет публикации, время которых наступило с прошлого запуска.
+        Возвращает их количество.
+        """
+        now = self.now()
+        announced = 0
+        last = None
+        while True:
+            with transaction.atomic():
+                state, created = SchedulerState.objects.select_for_update(
+                ).get_or_create(name=self.name, defaults={'position': now})
+                if created or now <= state.position:
+                    return announced
+                rows = self.get_batch(state.position, now, last)
+                if not rows:
+                    state.position = now
+                    state.save(update_fields=('position',))
+                    return announced
+                post_became_visible.send(
+                    sender=Post, rows=[row[:3] for row in rows])
+                announced += len(rows)
+                last = rows[-1][3], rows[-1][0]
+                # Публикации с тем же временем могли не войти в пачку.
+                state.position = max(
+                    state.position, last[0] - timedelta(microseconds=1))
+                state.save(update_fields=('position',))
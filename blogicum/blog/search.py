@@ -0,0 +1,278 @@
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import NotSupportedError, connections, router
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TERM = re.compile(r'\w+')
+MAX_TERMS = 8
+BATCH_SIZE = 500
+# Веса полей те же, что у ts_rank в PostgreSQL по умолчанию.
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+def get_terms(query):
+    """Слова запроса: операторы и служебные символы отбрасываются."""
+    return TERM.findall(query.lower())[:MAX_TERMS]
+
+
+class SearchIndex:
+    """
+    Полнотекстовый индекс модели в отдельной таблице.
+    weights - индексируемые поля и их веса от 'A' до 'D',
+    stored - поля, которые хранятся в индексе без разбора на слова.
+    """
+
+    def __init__(self, table, model, weights, stored=()):
+        self.table = table
+        self.model = model
+        self.weights = weights
+        self.stored = tuple(stored)
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_rows(self, queryset):
+        return queryset.order_by().values_list(
+            'pk', *self.stored, *self.weights)
+
+
+class SQLiteSearchBackend:
+    """Индекс в виртуальной таблице FTS5, rowid - ключ объекта."""
+
+    def create(self, cursor, index):
+        columns = [f'{field} UNINDEXED' for field in index.stored]
+        columns += index.weights
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {index.table} USING fts5('
+            f"{', '.join(columns)}, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def delete(self, cursor, index, pks):
+        if pks:
+            placeholders = ', '.join(['%s'] * len(pks))
+            cursor.execute(
+                f'DELETE FROM {index.table} WHERE rowid IN ({placeholders})',
+                list(pks))
+
+    def write(self, cursor, index, rows):
+        self.delete(cursor, index, [row[0] for row in rows])
+        columns = ('rowid', *index.stored, *index.weights)
+        cursor.executemany(
+            f"INSERT INTO {index.table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})", rows)
+
+    def make_query(self, terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def match(self, index, terms, column):
+        column = 'rowid' if column == 'pk' else column
+        return (
+            f'SELECT {column} FROM {index.table} '
+            f'WHERE {index.table} MATCH %s',
+            [self.make_query(terms)],
+        )
+
+    def rank(self, index, terms, pk_column):
+        weights = [0] * len(index.stored) + [
+            WEIGHTS[weight] for weight in index.weights.values()]
+        return (
+            f"SELECT -bm25({index.table}, {', '.join(map(str, weights))}) "
+            f'FROM {index.table} '
+            f'WHERE {index.table} MATCH %s AND rowid = {pk_column}',
+            [self.make_query(terms)],
+        )
+
+
+class PostgresSearchBackend:
+    """Индекс в таблице со столбцом tsvector и GIN-индексом по нему."""
+
+    def create(self, cursor, index):
+        columns = ''.join(
+            f'{field} bigint NOT NULL, ' for field in index.stored)
+        cursor.execute(
+            f'CREATE TABLE {index.table} '
+            f'(id bigint PRIMARY KEY, {columns}document tsvector NOT NULL)')
+        cursor.execute(
+            f'CREATE INDEX {index.table}_document_idx '
+            f'ON {index.table} USING GIN (document)')
+
+    def delete(self, cursor, index, pks):
+        if pks:
+            cursor.execute(
+                f'DELETE FROM {index.table} WHERE id = ANY(%s)', [list(pks)])
+
+    def write(self, cursor, index, rows):
+        config = settings.SEARCH_CONFIG
+        document = ' || '.join(
+            f"setweight(to_tsvector(%s::regconfig, %s), '{weight}')"
+            for weight in index.weights.values()
+        )
+        columns = ('id', *index.stored)
+        updates = ''.join(
+            f'{field} = EXCLUDED.{field}, ' for field in index.stored)
+        values = ', '.join(['%s'] * len(columns))
+        stored_count = len(columns)
+        cursor.executemany(
+            f"INSERT INTO {index.table} ({', '.join(columns)}, document) "
+            f'VALUES ({values}, {document}) '
+            f'ON CONFLICT (id) DO UPDATE SET {updates}'
+            f'document = EXCLUDED.document',
+            [
+                [*row[:stored_count], *(
+                    param for text in row[stored_count:]
+                    for param in (config, text)
+                )]
+                for row in rows
+            ],
+        )
+
+    def make_query(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def match(self, index, terms, column):
+        column = 'id' if column == 'pk' else column
+        return (
+            f'SELECT {column} FROM {index.table} '
+            f'WHERE document @@ to_tsquery(%s::regconfig, %s)',
+            [settings.SEARCH_CONFIG, self.make_query(terms)],
+        )
+
+    def rank(self, index, terms, pk_column):
+        return (
+            f'SELECT ts_rank(document, to_tsquery(%s::regconfig, %s))::float8 '
+            f'FROM {index.table} WHERE id = {pk_column}',
+            [settings.SEARCH_CONFIG, self.make_query(terms)],
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+post_index = SearchIndex(
+    'blog_postsearch', 'blog.Post', {'title': 'A', 'text': 'B'})
+comment_index = SearchIndex(
+    'blog_commentsearch', 'blog.Comment', {'text': 'A'}, stored=('post_id',))
+INDEXES = (post_index, comment_index)
+
+
+def get_backend(connection):
+    try:
+        return BACKENDS[connection.vendor]
+    except KeyError:
+        raise NotSupportedError(
+            f'Полнотекстовый поиск не поддерживается для {connection.vendor}.'
+        ) from None
+
+
+def get_write_connection(index, model=None):
+    return connections[router.db_for_write(model or index.get_model())]
+
+
+def create_index(index, connection):
+    with connection.cursor() as cursor:
+        get_backend(connection).create(cursor, index)
+
+
+def drop_index(index, connection):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+
+def update_index(index, pks):
+    """
+    Переиндексирует объекты с ключами pks.
+    Строки удалённых объектов убираются из индекса.
+    """
+    connection = get_write_connection(index)
+    backend = get_backend(connection)
+    rows = list(index.get_rows(
+        index.get_model()._base_manager.using(connection.alias)
+        .filter(pk__in=pks)))
+    missing = set(pks) - {row[0] for row in rows}
+    with connection.cursor() as cursor:
+        backend.delete(cursor, index, list(missing))
+        backend.write(cursor, index, rows)
+
+
+def remove_from_index(index, pks):
+    connection = get_write_connection(index)
+    with connection.cursor() as cursor:
+        get_backend(connection).delete(cursor, index, list(pks))
+
+
+def rebuild_index(index, model=None, using=None, batch_size=BATCH_SIZE):
+    """
+    Строит индекс заново, читая объекты пачками по ключу.
+    model и using позволяют передать историческую модель
+    и соединение из миграции.
+    """
+    model = model or index.get_model()
+    connection = (
+        connections[using] if using else get_write_connection(index, model))
+    backend = get_backend(connection)
+    queryset = model._base_manager.using(connection.alias).order_by('pk')
+    indexed = 0
+    last_pk = None
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {index.table}')
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(
+                pk__gt=last_pk)
+            rows = list(index.get_rows(batch).order_by('pk')[:batch_size])
+            if not rows:
+                break
+            backend.write(cursor, index, rows)
+            indexed += len(rows)
+            last_pk = rows[-1][0]
+    return indexed
+
+
+def get_pk_column(connection, model):
+    quote_name = connection.ops.quote_name
+    return (
+        f'{quote_name(model._meta.db_table)}.'
+        f'{quote_name(model._meta.pk.column)}'
+    )
+
+
+def search_posts(queryset, query, rank=True):
+    """
+    Публикации из queryset, подходящие под запрос.
+    Публикация находится по заголовку, тексту и комментариям.
+    С rank=True добавляет оценку релевантности search_rank:
+    совпадения только в комментариях получают нулевую оценку.
+    """
+    terms = get_terms(query)
+    if not terms:
+        queryset = queryset.none()
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+    backend = get_backend(connections[queryset.db])
+    queryset = queryset.filter(
+        Q(pk__in=RawSQL(*backend.match(post_index, terms, 'pk')))
+        | Q(pk__in=RawSQL(*backend.match(comment_index, terms, 'post_id')))
+    )
+    if not rank:
+        return queryset
+    sql, params = backend.rank(
+        post_index, terms,
+        get_pk_column(connections[queryset.db], queryset.model))
+    return queryset.annotate(search_rank=RawSQL(
+        f'COALESCE(({sql}), 0.0)', params, output_field=FloatField()))
+
+
+def search_comments(queryset, query):
+    """Комментарии из queryset, подходящие под запрос."""
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+    backend = get_backend(connections[queryset.db])
+    return queryset.filter(
+        pk__in=RawSQL(*backend.match(comment_index, terms, 'pk')))
@@ -0,0 +1,253 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .bulk import invalidate_posts
+from .counters import (change_feed_counters, get_category_deltas,
+                       get_feed_deltas)
+from .fragments import bump_version
+from .models import (Category, Comment, FeedCounter, Location, Post,
+                     PostImageRendition, StoredFile, User)
+from .page_cache import CONTENT_TAG, get_post_page_tags, invalidate_pages
+from .paginators import (admin_counts, categories, get_feed_key,
+                         get_post_feed_keys, invalidate_feed_counts,
+                         next_publications)
+from .scheduler import post_became_visible
+from .search import (comment_index, post_index, remove_from_index,
+                     update_index)
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0),
+        updated_at=timezone.now())
+    bump_version(Post(pk=post_id))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._previous_post_id = None
+    if instance.pk is not None:
+        instance._previous_post_id = Comment.objects.filter(
+            pk=instance.pk).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    if created:
+        change_comment_count(instance.post_id, 1)
+        return
+    previous_post_id = instance._previous_post_id
+    if previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+def change_file_refcount(name, delta):
+    if not name:
+        return
+    stored_file, _ = StoredFile.objects.get_or_create(name=name)
+    StoredFile.objects.filter(pk=stored_file.pk).update(
+        refcount=Greatest(F('refcount') + delta, 0))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    instance._previous_feeds = None
+    instance._previous_image = None
+    instance._previous_counted = None
+    if instance.pk is not None:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'category_id', 'author_id', 'image', 'is_published',
+            'category__is_published').first()
+        if previous is not None:
+            instance._previous_feeds = previous[:2]
+            instance._previous_image = previous[2]
+            instance._previous_counted = (
+                *previous[:2], bool(previous[3] and previous[4]))
+
+
+@receiver(post_save, sender=Post)
+def update_image_refcount(sender, instance, **kwargs):
+    previous_image = instance._previous_image
+    if instance.image.name != previous_image:
+        change_file_refcount(instance.image.name, 1)
+        change_file_refcount(previous_image, -1)
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    change_file_refcount(instance.image.name, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feed_counts(sender, instance, **kwargs):
+    feed_keys = set(
+        get_post_feed_keys(instance.category_id, instance.author_id))
+    previous_feeds = getattr(instance, '_previous_feeds', None)
+    if previous_feeds is not None:
+        feed_keys.update(get_post_feed_keys(*previous_feeds))
+    invalidate_feed_counts(feed_keys)
+    next_publications.invalidate()
+
+
+def get_counted_state(post):
+    visible = post.is_published and post.category_id is not None and (
+        Category.objects.filter(
+            pk=post.category_id, is_published=True).exists())
+    return post.category_id, post.author_id, visible
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_counted', None)
+    change_feed_counters(get_feed_deltas(
+        [previous] if previous is not None else [],
+        [get_counted_state(instance)]))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_feed_counters(get_feed_deltas([get_counted_state(instance)]))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_published(sender, instance, **kwargs):
+    instance._was_published = Category.objects.filter(
+        pk=instance.pk).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def count_category_posts(sender, instance, created, **kwargs):
+    was_published = getattr(instance, '_was_published', None)
+    if not created and was_published is not None and (
+            was_published != instance.is_published):
+        change_feed_counters(get_category_deltas(
+            instance, 1 if instance.is_published else -1))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_posts(sender, instance, **kwargs):
+    # После удаления у публикаций категории уже не будет.
+    instance._feed_deltas = (
+        get_category_deltas(instance, -1) if instance.is_published else {})
+
+
+@receiver(post_delete, sender=Category)
+def uncount_category_posts(sender, instance, **kwargs):
+    change_feed_counters(instance._feed_deltas)
+    FeedCounter.objects.filter(key=get_feed_key(category=instance)).delete()
+
+
+@receiver(post_delete, sender=User)
+def delete_author_counters(sender, instance, **kwargs):
+    FeedCounter.objects.filter(key__in=[
+        get_feed_key(author=instance),
+        get_feed_key(author=instance, published_only=False),
+    ]).delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_admin_counts(sender, instance, **kwargs):
+    admin_counts.invalidate()
+
+
+@receiver(post_became_visible)
+def refresh_visible_posts(sender, rows, **kwargs):
+    invalidate_posts(rows)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    invalidate_feed_counts()
+    categories.invalidate()
+
+
+def is_login_update(update_fields):
+    return bool(update_fields) and set(update_fields) <= {'last_login'}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=User)
+def bump_card_version(sender, instance, update_fields=None, **kwargs):
+    if not is_login_update(update_fields):
+        bump_version(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    category_ids = {instance.category_id}
+    author_ids = {instance.author_id}
+    previous_feeds = getattr(instance, '_previous_feeds', None)
+    if previous_feeds is not None:
+        category_ids.add(previous_feeds[0])
+        author_ids.add(previous_feeds[1])
+    invalidate_pages(*get_post_page_tags(
+        (instance.pk,), category_ids, author_ids))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    post_ids = {instance.post_id}
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id is not None:
+        post_ids.add(previous_post_id)
+    feeds = Post.objects.filter(pk__in=post_ids).values_list(
+        'category_id', 'author_id')
+    invalidate_pages(*get_post_page_tags(
+        post_ids,
+        [category_id for category_id, _ in feeds],
+        [author_id for _, author_id in feeds],
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_all_pages(sender, instance, update_fields=None, **kwargs):
+    if not is_login_update(update_fields):
+        invalidate_pages(CONTENT_TAG)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    index = post_index if sender is Post else comment_index
+    if update_fields is None or set(update_fields) & {
+            *index.weights, *index.stored}:
+        update_index(index, [instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    index = post_index if sender is Post else comment_index
+    remove_from_index(index, [instance.pk])
+
+
+@receiver(post_delete, sender=PostImageRendition)
+def delete_rendition_file(sender, instance, **kwargs):
+    instance.image.delete(save=False)
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def get_content_hash(content):
+    """
+    SHA-256 содержимого файла.
+    Использует хеш, посчитанный при загрузке, если он есть.
+    """
+    digest = getattr(content, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+    return digest
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, которое называет файлы по SHA-256 содержимого.
+    Одинаковые файлы хранятся в одном экземпляре: сохранение
+    уже записанного содержимого возвращает имя существующего файла.
+    """
+
+    def get_content_name(self, name, content):
+        digest = get_content_hash(content)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
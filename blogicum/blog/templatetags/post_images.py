@@ -0,0 +1,40 @@
+from django import template
+
+from ..models import PostImageRendition
+
+register = template.Library()
+
+SIZES = {
+    PostImageRendition.CARD: '(max-width: 640px) 100vw, 640px',
+    PostImageRendition.DETAIL: '(max-width: 1280px) 100vw, 1280px',
+}
+
+
+def get_srcset(renditions):
+    urls = {rendition.width: rendition.image.url for rendition in renditions}
+    return ', '.join(f'{url} {width}w' for width, url in sorted(urls.items()))
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, kind):
+    """
+    Выводит изображение публикации с уменьшенными копиями в srcset.
+    Пока копий нет, показывает исходный файл.
+    """
+    renditions = list(post.renditions.all())
+    jpeg = [
+        rendition for rendition in renditions
+        if rendition.format == PostImageRendition.JPEG
+    ]
+    main = next(
+        (rendition for rendition in jpeg if rendition.kind == kind), None)
+    return {
+        'post': post,
+        'main': main,
+        'sizes': SIZES[kind],
+        'jpeg_srcset': get_srcset(jpeg),
+        'webp_srcset': get_srcset(
+            rendition for rendition in renditions
+            if rendition.format == PostImageRendition.WEBP
+        ),
+    }
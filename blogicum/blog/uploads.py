@@ -0,0 +1,144 @@
+import hashlib
+import tempfile
+import warnings
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (FileUploadHandler,
+                                             StopFutureHandlers, StopUpload)
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+
+class RejectedUpload(UploadedFile):
+    """Загрузка, отклонённая обработчиком; причина — в upload_error."""
+
+    def __init__(self, name, size, upload_error):
+        super().__init__(BytesIO(), name, size=size)
+        self.upload_error = upload_error
+
+
+class PostImageUploadHandler(FileUploadHandler):
+    """
+    Принимает изображение публикации потоком.
+    Прерывает приём, как только файл превышает POST_IMAGE_MAX_SIZE,
+    а заголовок изображения — POST_IMAGE_MAX_PIXELS или оказывается
+    не изображением, не дожидаясь конца загрузки и не декодируя
+    пиксели: остаток тела запроса не читается, а поля после файла
+    не попадают в форму. Отклонённый файл остаётся в rejected.
+    Попутно считает SHA-256 для хранилища по содержимому.
+    """
+
+    image_field = 'image'
+    # Метаданные EXIF, ICC и XMP у фотографий с телефона бывают
+    # больше первого фрагмента, поэтому заголовок копится до этого
+    # предела, а не до размера одного фрагмента.
+    max_header_size = 4 * 1024 * 1024
+    rejected = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.image_field
+        if not self.active:
+            return
+        self.size = 0
+        self.error = None
+        self.header = b''
+        self.header_checked = False
+        self.hasher = hashlib.sha256()
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE,
+            dir=settings.FILE_UPLOAD_TEMP_DIR,
+        )
+        raise StopFutureHandlers()
+
+    def reject(self, error):
+        self.error = error
+        self.file.close()
+        self.rejected = RejectedUpload(self.file_name, self.size, error)
+
+    def get_pixels_error(self):
+        return (
+            'Изображение слишком большое: не более '
+            f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.')
+
+    def check_header(self, final=False):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+                with Image.open(BytesIO(self.header)) as image:
+                    width, height = image.size
+                    image_format = image.format
+        except Image.DecompressionBombError:
+            self.reject(self.get_pixels_error())
+            return
+        except Exception:
+            # Заголовок ещё не пришёл целиком или файл не изображение.
+            if final or len(self.header) >= self.max_header_size:
+                self.reject('Загрузите правильное изображение.')
+            return
+        self.header_checked = True
+        self.header = b''
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            self.reject(self.get_pixels_error())
+        elif image_format not in IMAGE_FORMATS:
+            self.reject('Неподдерживаемый формат изображения.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > settings.POST_IMAGE_MAX_SIZE:
+            self.reject(
+                'Размер файла не должен превышать '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_SIZE)}.')
+        elif not self.header_checked:
+            self.header += raw_data
+            self.check_header()
+        if self.error:
+            raise StopUpload(connection_reset=True)
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if not self.error and not self.header_checked:
+            self.check_header(final=True)
+        if self.error:
+            return self.rejected
+        self.file.seek(0)
+        upload = UploadedFile(
+            self.file, self.file_name, self.content_type, file_size,
+            self.charset, self.content_type_extra)
+        upload.sha256 = self.hasher.hexdigest()
+        return upload
+
+
+def stream_image_uploads(view):
+    """
+    Подключает PostImageUploadHandler к представлению.
+    Обработчик нужно добавить до чтения тела запроса, поэтому
+    проверка CSRF переносится из middleware внутрь представления.
+    Файл, на котором приём был прерван, возвращается в FILES,
+    чтобы форма показала причину.
+    """
+    protected_view = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        handler = PostImageUploadHandler(request)
+        request.upload_handlers.insert(0, handler)
+        if request.method == 'POST':
+            files = request.FILES
+            if handler.rejected is not None:
+                files.setdefault(handler.image_field, handler.rejected)
+        return protected_view(request, *args, **kwargs)
+    return wrapper
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = 'blog'
 
@@ -22,6 +22,9 @@ urlpatterns = [
          views.post_detail,
          name='post_detail'),
 
+    path('posts/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -36,10 +39,30 @@ urlpatterns = [
          views.category_posts,
          name='category_posts'),
 
+    path('search/',
+         views.search,
+         name='search'),
+
     path('profile/edit/',
          views.EditProfileUpdateView.as_view(),
          name='edit_profile'),
     path('profile/<str:username>/',
          views.ProfileDetailView.as_view(),
          name='profile'),
+
+    path('api/posts/',
+         api.post_list,
+         name='api_posts'),
+    path('api/posts/<int:post_id>/',
+         api.post_detail,
+         name='api_post_detail'),
+    path('api/posts/<int:post_id>/comments/',
+         api.comment_list,
+         name='api_comments'),
+    path('api/category/<slug:category_slug>/posts/',
+         api.category_post_list,
+         name='api_category_posts'),
+    path('api/profile/<str:username>/posts/',
+         api.profile_post_list,
+         name='api_profile_posts'),
 ]
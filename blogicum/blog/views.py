@@ -1,64 +1,221 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
 
+from . import bulk
+from .conditional import conditional_page
 from .forms import CommentForm, EditProfileForm, PostForm
-from .models import Category, Comment, Post, User
+from .fragments import attach_card_versions
+from .images import process_post_image
+from .jobs import enqueue
+from .models import Comment, Post, User
+from .page_cache import (CONTENT_TAG, cache_anonymous_page,
+                         get_tags_modified_at)
+from .paginators import (CursorPaginator, FeedPaginator, get_feed_key,
+                         get_next_publication, get_published_category)
+from .search import search_posts
+from .uploads import stream_image_uploads
+
+COMMENTS_PER_PAGE = 50
+SEARCH_RESULTS_PER_PAGE = 10
+
+
+def get_published_filter():
+    return Q(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=timezone.now()
+    )
 
 
 def get_posts(posts=Post.objects, related=True, filter=True, annotate=True):
     if related:
         posts = posts.select_related('author', 'category', 'location')
     if filter:
-        posts = posts.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
-        )
+        posts = posts.filter(get_published_filter())
     if annotate:
-        posts = posts.annotate(
-            comment_count=Count('comments')).order_by(*Post._meta.ordering)
+        posts = posts.order_by(*Post._meta.ordering, '-pk')
     return posts
 
 
 def get_paginator(request, queryset,
-                  number_of_pages=10):
-    return Paginator(queryset, number_of_pages
-                     ).get_page(request.GET.get('page'))
-
-
+                  number_of_pages=10, feed_key=None):
+    queryset = queryset.prefetch_related('renditions')
+    cursor_paginator = CursorPaginator(queryset, number_of_pages)
+    if 'cursor' in request.GET:
+        page = cursor_paginator.get_page(request.GET['cursor'])
+        attach_card_versions(page)
+        return page
+    if feed_key is None:
+        paginator = Paginator(queryset, number_of_pages)
+    else:
+        paginator = FeedPaginator(queryset, number_of_pages, feed_key)
+    page = paginator.get_page(request.GET.get('page'))
+    page.elided_page_range = page.paginator.get_elided_page_range(
+        page.number)
+    if page.has_next():
+        page.next_cursor = cursor_paginator.encode_cursor(page[-1])
+    attach_card_versions(page)
+    return page
+
+
+def get_feed_validators(tag, scheduled=None):
+    """
+    Валидаторы ленты без запросов к публикациям.
+    Дата изменения - время сброса тега страниц ленты или общего тега
+    содержимого: сигналы сбрасывают их при любом изменении публикаций,
+    категорий, местоположений и авторов. Отложенные публикации
+    с условиями scheduled меняют ETag, когда наступает их время.
+    """
+    validators = {'modified_at': get_tags_modified_at([CONTENT_TAG, tag])}
+    if scheduled is not None:
+        validators['next_publication'] = get_next_publication(scheduled)
+    return validators
+
+
+def get_visible_posts(user, posts=Post.objects):
+    visible = get_published_filter()
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return posts.filter(visible)
+
+
+def get_comments_page(request, post):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_PER_PAGE,
+        ordering=('created_at', 'pk'),
+    ).get_page(request.GET.get('cursor'))
+
+
+def get_index_validators(request):
+    return get_feed_validators('feed:global', {})
+
+
+def get_post_validators(request, post_id):
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'is_published', 'pub_date', 'updated_at',
+        'comment_count', 'category__is_published', 'category__updated_at',
+        'location__updated_at',
+    ).first()
+    if post is None:
+        return None
+    if post['author_id'] != request.user.pk and not (
+            post['is_published'] and post['category__is_published']
+            and post['pub_date'] <= timezone.now()):
+        return None
+    # Имена авторов публикации и комментариев в строках не хранятся:
+    # их изменения видны только по тегам страниц.
+    post['modified_at'] = get_tags_modified_at(
+        [CONTENT_TAG, f'post:{post_id}'])
+    return post
+
+
+def get_category_validators(request, category_slug):
+    try:
+        category = get_published_category(category_slug)
+    except Http404:
+        return None
+    return {
+        **get_feed_validators(
+            f'feed:category:{category_slug}',
+            {'category__slug': category_slug}),
+        'category': {'pk': category.pk, 'updated_at': category.updated_at},
+    }
+
+
+def get_profile_validators(request, username):
+    author = User.objects.filter(username=username).values('pk').first()
+    if author is None:
+        return None
+    published_only = author['pk'] != request.user.pk
+    return {
+        **get_feed_validators(
+            f'feed:author:{username}',
+            {'author__username': username} if published_only else None),
+        'author': author,
+    }
+
+
+@cache_anonymous_page('feed:global', scheduled={})
+@conditional_page(get_index_validators)
 def index(request):
     return render(request, 'blog/index.html', {
-        'page_obj': get_paginator(request, get_posts())})
+        'page_obj': get_paginator(
+            request, get_posts(), feed_key=get_feed_key())})
 
 
+@cache_anonymous_page('post:{post_id}')
+@conditional_page(get_post_validators)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
-        post = get_object_or_404(
-            get_posts(related=False, annotate=False), pk=post_id)
+    post = get_object_or_404(
+        get_visible_posts(
+            request.user, get_posts(filter=False, annotate=False)
+        ).prefetch_related('renditions'),
+        pk=post_id)
     return render(request, 'blog/detail.html', {
         'post': post,
         'form': CommentForm(),
-        'comments': post.comments.select_related('author')
+        'comments': get_comments_page(request, post)
     })
 
 
+@cache_anonymous_page('post:{post_id}')
+@conditional_page(get_post_validators)
+def post_comments(request, post_id):
+    post = get_object_or_404(
+        get_visible_posts(request.user).only('pk'), pk=post_id)
+    return render(request, 'includes/comment_list.html', {
+        'post': post,
+        'comments': get_comments_page(request, post)
+    })
+
+
+@cache_anonymous_page('feed:category:{category_slug}',
+                      scheduled={'category__slug': '{category_slug}'})
+@conditional_page(get_category_validators)
 def category_posts(request, category_slug):
-    category = get_object_or_404(Category,
-                                 slug=category_slug,
-                                 is_published=True)
+    category = get_published_category(category_slug)
     return render(request, 'blog/category.html', {
         'category': category,
-        'page_obj': get_paginator(request, get_posts(category.posts))
+        'page_obj': get_paginator(
+            request, get_posts(category.posts),
+            feed_key=get_feed_key(category=category))
     })
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        posts = search_posts(
+            get_visible_posts(
+                request.user, get_posts(filter=False, annotate=False)),
+            query)
+        page_obj = CursorPaginator(
+            posts.prefetch_related('renditions'),
+            SEARCH_RESULTS_PER_PAGE,
+            ordering=('-search_rank', '-pk'),
+        ).get_page(request.GET.get('cursor'))
+        attach_card_versions(page_obj)
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+    })
+
+
+@method_decorator(
+    cache_anonymous_page('feed:author:{username}',
+                         scheduled={'author__username': '{username}'}),
+    name='dispatch')
 class ProfileDetailView(DetailView):
     model = User
     template_name = 'blog/profile.html'
@@ -69,12 +226,15 @@ class ProfileDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         user = self.get_object()
+        published_only = self.request.user != user
         return super().get_context_data(
             **kwargs,
             form=CommentForm(),
             page_obj=get_paginator(
                 self.request,
-                get_posts(user.posts.all(), filter=self.request.user != user))
+                get_posts(user.posts.all(), filter=published_only),
+                feed_key=get_feed_key(
+                    author=user, published_only=published_only))
         )
 
 
@@ -97,17 +257,22 @@ class EditProfileUpdateView(LoginRequiredMixin,
 
 
 @login_required
+@stream_image_uploads
 def create_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(request, 'blog/create.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
+    post.image_processing = bool(post.image)
     post.save()
+    if post.image:
+        enqueue(process_post_image, post_id=post.pk)
     return redirect('blog:profile', request.user.username)
 
 
 @login_required
+@stream_image_uploads
 def edit_post(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
@@ -115,7 +280,13 @@ def edit_post(request, post_id):
     form = PostForm(
         request.POST or None, files=request.FILES or None, instance=post)
     if form.is_valid():
-        form.save()
+        post = form.save(commit=False)
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            post.image_processing = bool(post.image)
+        post.save()
+        if image_changed:
+            enqueue(process_post_image, post_id=post.pk)
         return redirect('blog:post_detail', post.id)
     return render(request, 'blog/create.html', {'form': form})
 
@@ -126,7 +297,9 @@ def delete_post(request, post_id=None):
     if instance.author != request.user:
         return redirect('blog:post_detail', post_id)
     if request.method == 'POST':
-        instance.delete()
+        with transaction.atomic():
+            bulk.delete_comments(instance.comments.all())
+            instance.delete()
         return redirect('blog:profile', username=request.user.username)
     return render(request, 'blog/create.html',
                   {'form': PostForm(instance=instance)})
@@ -152,6 +325,7 @@ class AuthorPermissionMixin:
 class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
     form_class = CommentForm
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
         form.instance.author = self.request.user
@@ -165,4 +339,7 @@ class CommentUpdateView(AuthorPermissionMixin, CommentMixin,
 
 class CommentDeleteView(AuthorPermissionMixin, CommentMixin,
                         LoginRequiredMixin, DeleteView):
-    pass
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
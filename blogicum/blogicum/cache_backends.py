@@ -0,0 +1,136 @@
+import pickle
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class RedisCache(BaseCache):
+    """
+    Кеш на Redis или совместимом сервере (KeyDB, Dragonfly).
+    В Django 3.2 такого бэкенда нет, поэтому он написан поверх redis-py.
+    LOCATION - адрес вида redis://host:6379/0. OPTIONS['CLIENT_CLASS']
+    задаёт класс клиента с методом from_url, например
+    'fakeredis.FakeRedis' в тестах.
+    Целые числа хранятся как есть, чтобы incr выполнялся на сервере,
+    остальные значения сериализуются pickle.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._server = server
+        self._options = params.get('OPTIONS') or {}
+
+    @cached_property
+    def client(self):
+        try:
+            client_class = import_string(
+                self._options.get('CLIENT_CLASS', 'redis.Redis'))
+        except ImportError as error:
+            raise ImproperlyConfigured(
+                'Для кеша в Redis установите пакет redis.') from error
+        return client_class.from_url(self._server)
+
+    def dumps(self, value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def get_backend_timeout(self, timeout=DEFAULT_TIMEOUT):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        # Redis принимает срок жизни в целых миллисекундах.
+        return max(0, int(timeout * 1000))
+
+    def prepare_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.prepare_key(key, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout == 0:
+            return False
+        return bool(
+            self.client.set(key, self.dumps(value), px=timeout, nx=True))
+
+    def get(self, key, default=None, version=None):
+        data = self.client.get(self.prepare_key(key, version))
+        return default if data is None else self.loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.prepare_key(key, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout == 0:
+            self.client.delete(key)
+        else:
+            self.client.set(key, self.dumps(value), px=timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.prepare_key(key, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return bool(self.client.persist(key))
+        return bool(self.client.pexpire(key, timeout))
+
+    def delete(self, key, version=None):
+        return bool(self.client.delete(self.prepare_key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget(
+            [self.prepare_key(key, version) for key in keys])
+        return {
+            key: self.loads(data)
+            for key, data in zip(keys, values) if data is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        timeout = self.get_backend_timeout(timeout)
+        with self.client.pipeline() as pipeline:
+            for key, value in data.items():
+                key = self.prepare_key(key, version)
+                if timeout == 0:
+                    pipeline.delete(key)
+                else:
+                    pipeline.set(key, self.dumps(value), px=timeout)
+            pipeline.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.prepare_key(key, version) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def has_key(self, key, version=None):
+        return bool(self.client.exists(self.prepare_key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.prepare_key(key, version)
+        if not self.client.exists(key):
+            raise ValueError(f"Key '{key}' not found.")
+        return self.client.incrby(key, delta)
+
+    def clear(self):
+        # Удаляются только ключи этого кеша: база Redis может быть общей.
+        keys = list(self.client.scan_iter(match=f'{self.key_prefix}:*'))
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*keys[start:start + 1000])
+
+    def close(self, **kwargs):
+        # Соединения остаются в пуле клиента между запросами.
+        pass
@@ -0,0 +1,4 @@
+"""
+Обёртки над встроенными бэкендами баз данных.
+Подключаются через ENGINE в DATABASES, см. settings/base.py.
+"""
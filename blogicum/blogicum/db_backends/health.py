@@ -0,0 +1,22 @@
+class HealthCheckMixin:
+    """
+    Проверяет постоянное соединение перед первым запросом в цикле
+    запрос-ответ и переоткрывает его, если сервер его разорвал.
+    Включается ключом CONN_HEALTH_CHECKS в настройках базы.
+    """
+
+    health_check_done = False
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if (self.connection is not None
+                and not self.health_check_done
+                and self.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not self.in_atomic_block):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
@@ -0,0 +1,30 @@
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite, настроенный для одновременной работы нескольких процессов.
+    Каждое новое соединение получает прагмы из PRAGMAS (их можно
+    переопределить ключом PRAGMAS в настройках базы), а транзакции
+    открываются через BEGIN IMMEDIATE: блокировка на запись берётся
+    сразу, и конкурирующая транзакция ждёт busy_timeout, а не падает
+    с «database is locked» при попытке перейти от чтения к записи.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        pragmas = {**PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE', 'IMMEDIATE')
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,95 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+PIN_COOKIE = 'use_primary'
+PIN_CACHE_KEY = 'replicas:use-primary'
+
+use_replica = ContextVar('use_replica', default=False)
+wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+replica_pinned = ContextVar('replica_pinned', default=False)
+pinned_until = ContextVar('pinned_until', default=0.0)
+
+
+def can_fill_caches():
+    """
+    Можно ли сохранять в кеши прочитанное в текущем запросе.
+    Пока после записи действует метка в общем кеше, реплика может
+    не видеть изменений, по которым сигналы только что сбросили кеши.
+    """
+    return not (use_replica.get() and replica_pinned.get())
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение на реплики из DATABASE_REPLICAS, запись — в default.
+    Реплики используются, только если ReplicaMiddleware разрешил это
+    для текущего запроса; команды, фоновые задачи и всё, что идёт
+    после записи, читают с основной базы.
+    Запись ставит в общем кеше метку на REPLICA_PIN_SECONDS: сигналы
+    в это время сбрасывают кеши страниц, карточек и счётчиков,
+    и заполнять их данными отстающей реплики нельзя. Метка продлевается
+    не чаще раза в REPLICA_PIN_SECONDS и живёт вдвое дольше, так что
+    каждая запись покрыта целым окном.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and use_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        use_replica.set(False)
+        wrote_to_primary.set(True)
+        now = time.monotonic()
+        if settings.DATABASE_REPLICAS and now >= pinned_until.get():
+            cache.set(PIN_CACHE_KEY, 1, 2 * settings.REPLICA_PIN_SECONDS)
+            pinned_until.set(now + settings.REPLICA_PIN_SECONDS)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """
+    Разрешает чтение с реплик в GET- и HEAD-запросах. Если недавно
+    была запись, чтение всё равно идёт с реплик, но прочитанное
+    не сохраняется в кеши, см. can_fill_caches.
+    После запроса с записью ставит cookie, и следующие
+    REPLICA_PIN_SECONDS секунд запросы этого браузера читают
+    с основной базы: автор сразу видит свой комментарий,
+    даже если реплика ещё отстаёт, а кеш у каждого процесса свой.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas_allowed = (
+            request.method in ('GET', 'HEAD')
+            and PIN_COOKIE not in request.COOKIES)
+        replica_token = use_replica.set(replicas_allowed)
+        pinned_token = replica_pinned.set(
+            replicas_allowed and cache.get(PIN_CACHE_KEY) is not None)
+        wrote_token = wrote_to_primary.set(False)
+        try:
+            response = self.get_response(request)
+            if wrote_to_primary.get():
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax')
+        finally:
+            use_replica.reset(replica_token)
+            replica_pinned.reset(pinned_token)
+            wrote_to_primary.reset(wrote_token)
+        return response
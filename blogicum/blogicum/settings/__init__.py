@@ -0,0 +1,26 @@
+"""
+Настройки проекта по окружениям.
+Окружение выбирается переменной DJANGO_ENV: dev (по умолчанию), test
+или prod; боевое окружение включается только явно. Можно указать модуль
+окружения и напрямую: DJANGO_SETTINGS_MODULE=blogicum.settings.prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DJANGO_ENV = os.getenv('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+elif DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестное окружение DJANGO_ENV={DJANGO_ENV!r}:'
+        ' ожидается dev, test или prod.'
+    )
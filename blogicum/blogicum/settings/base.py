@@ -0,0 +1,238 @@
+"""Общие настройки всех окружений."""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-this-is-a-test-key-for-development-only')
+
+DEBUG = os.getenv('DEBUG', 'False') == 'True'
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost 127.0.0.1').split()
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django_bootstrap5',
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'blogicum.staticfiles.StaticFilesMiddleware',
+    'blogicum.routers.ReplicaMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+if os.getenv('DB_ENGINE', 'sqlite3') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'blogicum.db_backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'blogicum'),
+            'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': os.getenv('CONN_HEALTH_CHECKS', 'True') == 'True',
+            # PgBouncer в режиме транзакций не сохраняет курсоры между ними.
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_POOLER', 'False') == 'True',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'blogicum.db_backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600)),
+        }
+    }
+
+# Реплики только для чтения: хосты Postgres или пути к файлам SQLite.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(os.getenv('DB_REPLICAS', '').split(), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        ('HOST' if 'postgresql' in DATABASES['default']['ENGINE'] else 'NAME'): replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blogicum.routers.ReplicaRouter']
+
+# Сколько секунд после записи читать с основной базы, пока реплики догоняют.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = False
+
+USE_TZ = True
+
+
+STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'static'
+STATICFILES_DIRS = [
+    BASE_DIR / 'static_dev',
+]
+STATICFILES_STORAGE = os.getenv(
+    'STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 600))
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+LOGIN_REDIRECT_URL = 'blog:index'
+
+LOGIN_URL = '/auth/login/'
+
+AUTH_USER_MODEL = 'auth.User'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'blogicum.cache_backends.RedisCache',
+}
+
+
+def get_cache(backend, location, name):
+    """Настройки кеша: locmem, file или redis (и совместимые серверы)."""
+    default_locations = {
+        'locmem': name,
+        'file': str(BASE_DIR / '.cache' / name),
+        'redis': 'redis://localhost:6379/0',
+    }
+    config = {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'LOCATION': location or default_locations[backend],
+        'KEY_PREFIX': name,
+    }
+    if backend != 'redis':
+        # При переполнении locmem и file удаляют 1/CULL_FREQUENCY
+        # записей, а file ещё и перебирает все файлы при каждой записи.
+        config['OPTIONS'] = {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+            'CULL_FREQUENCY': int(os.getenv('CACHE_CULL_FREQUENCY', 10)),
+        }
+    return config
+
+
+CACHES = {
+    'default': get_cache(
+        os.getenv('CACHE_BACKEND', 'locmem'),
+        os.getenv('CACHE_LOCATION'),
+        'default',
+    ),
+    # Отдельный кеш, чтобы сессии не вытеснялись страницами и фрагментами.
+    # Он общий для процессов сервера: выход из аккаунта и очистка сессий
+    # сразу видны всем, а не только процессу, который их выполнил.
+    'sessions': get_cache(
+        os.getenv('SESSION_CACHE_BACKEND', 'file'),
+        os.getenv('SESSION_CACHE_LOCATION'),
+        'sessions',
+    ),
+}
+
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+FEED_COUNT_CACHE_TIMEOUT = int(os.getenv('FEED_COUNT_CACHE_TIMEOUT', 300))
+
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', 600))
+
+CATEGORY_CACHE_TIMEOUT = int(os.getenv('CATEGORY_CACHE_TIMEOUT', 3600))
+
+NEXT_PUBLICATION_CACHE_TIMEOUT = int(
+    os.getenv('NEXT_PUBLICATION_CACHE_TIMEOUT', 3600))
+
+ADMIN_COUNT_CACHE_TIMEOUT = int(os.getenv('ADMIN_COUNT_CACHE_TIMEOUT', 60))
+
+# Начиная с этого числа строк админка берёт оценку из статистики PostgreSQL.
+ADMIN_ESTIMATED_COUNT_MIN = int(
+    os.getenv('ADMIN_ESTIMATED_COUNT_MIN', 100_000))
+
+# Конфигурация текстового поиска PostgreSQL; в SQLite не используется.
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'russian')
+
+FEED_APPROXIMATE_COUNT = os.getenv('FEED_APPROXIMATE_COUNT', 'False') == 'True'
+
+JOBS_RUN_INLINE = os.getenv('JOBS_RUN_INLINE', 'False') == 'True'
+
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+
+JOBS_RETRY_DELAY = int(os.getenv('JOBS_RETRY_DELAY', 60))
+
+JOBS_LOCK_TIMEOUT = int(os.getenv('JOBS_LOCK_TIMEOUT', 600))
+
+POST_IMAGE_MAX_SIZE = int(os.getenv('POST_IMAGE_MAX_SIZE', 10 * 1024 * 1024))
+
+POST_IMAGE_MAX_PIXELS = int(os.getenv('POST_IMAGE_MAX_PIXELS', 40_000_000))
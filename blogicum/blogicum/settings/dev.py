@@ -0,0 +1,13 @@
+"""Локальная разработка: DEBUG и django-debug-toolbar."""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = os.getenv('DEBUG', 'True') == 'True'
+
+INTERNAL_IPS = ['127.0.0.1']
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
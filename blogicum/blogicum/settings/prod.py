@@ -0,0 +1,24 @@
+"""Боевой сервер: без отладочных приложений, статика с хешами в именах."""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import CACHES, get_cache
+
+DEBUG = False
+
+STATICFILES_STORAGE = os.getenv(
+    'STATICFILES_STORAGE',
+    'blogicum.staticfiles.CompressedManifestStaticFilesStorage',
+)
+
+# Кеш общий для всех процессов сервера: сигналы сбрасывают страницы,
+# карточки и счётчики сразу везде, а не только в процессе, который
+# выполнил запись.
+CACHES = {
+    **CACHES,
+    'default': get_cache(
+        os.getenv('CACHE_BACKEND', 'file'),
+        os.getenv('CACHE_LOCATION'),
+        'default',
+    ),
+}
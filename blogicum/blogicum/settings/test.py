@@ -0,0 +1,14 @@
+"""Запуск тестов: быстрый хешер паролей и фоновые задачи без обработчика."""
+from .base import *  # noqa: F401,F403
+from .base import get_cache
+
+DEBUG = False
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+JOBS_RUN_INLINE = True
+
+CACHES = {
+    'default': get_cache('locmem', None, 'default'),
+    'sessions': get_cache('locmem', None, 'sessions'),
+}
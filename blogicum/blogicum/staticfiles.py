@@ -0,0 +1,141 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico')
+MIN_COMPRESS_SIZE = 256
+# Имена, в которых есть хеш содержимого: style.3f2a9c1b7e4d.css
+# после collectstatic и <sha256>.jpg в хранилище изображений.
+HASHED_NAME = re.compile(r'(\.[0-9a-f]{12}|/[0-9a-f]{64})\.\w+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def compress(data):
+    """Сжатые варианты файла: расширение -> содержимое."""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    return {
+        extension: compressed for extension, compressed in variants.items()
+        if len(compressed) < len(data) * 0.95
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хешами в именах файлов.
+    При collectstatic рядом с текстовыми файлами сохраняются
+    сжатые копии .gz и, если установлен brotli, .br.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as static_file:
+                data = static_file.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            for extension, compressed in compress(data).items():
+                path = self.path(name + extension)
+                with open(path, 'wb') as compressed_file:
+                    compressed_file.write(compressed)
+                yield name, name + extension, True
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт статику из STATIC_ROOT и загруженные файлы из MEDIA_ROOT
+    до остальных middleware.
+    Выбирает сжатую копию по Accept-Encoding, отдаёт файлы через
+    FileResponse, который WSGI-сервер может передать в sendfile,
+    а файлам с хешем в имени ставит кеширование на год.
+    В режиме DEBUG не используется: статику отдаёт runserver.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.roots = [
+            (settings.STATIC_URL, settings.STATIC_ROOT, True),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT, False),
+        ]
+
+    def __call__(self, request):
+        response = None
+        if request.method in ('GET', 'HEAD'):
+            response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def find_file(self, path):
+        for url, root, compressed in self.roots:
+            if not root or not url or not path.startswith(url):
+                continue
+            try:
+                full_path = safe_join(root, path[len(url):])
+            except SuspiciousFileOperation:
+                return None, False
+            if os.path.isfile(full_path):
+                return full_path, compressed
+        return None, False
+
+    def serve(self, request):
+        path, compressed = self.find_file(request.path)
+        if path is None:
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        encoding = None
+        if compressed and path.endswith(COMPRESSIBLE_EXTENSIONS):
+            accepted = {
+                token.split(';')[0].strip() for token in
+                request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+            }
+            for name, extension in (('br', '.br'), ('gzip', '.gz')):
+                if name in accepted and os.path.isfile(path + extension):
+                    encoding = name
+                    path += extension
+                    break
+        stat = os.stat(path)
+        if not was_modified_since(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                stat.st_mtime, stat.st_size):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=content_type or 'application/octet-stream')
+            response['Last-Modified'] = http_date(stat.st_mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        if compressed:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if HASHED_NAME.search(request.path):
+            response['Cache-Control'] = (
+                f'public, max-age={IMMUTABLE_MAX_AGE}, immutable')
+        else:
+            response['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_MAX_AGE}')
+        return response
@@ -1,4 +1,5 @@
 from blog.forms import ProfileForm
+from django.apps import apps
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -21,9 +22,11 @@ urlpatterns = [
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
-if settings.DEBUG:
+if apps.is_installed('debug_toolbar'):
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+
+if settings.DEBUG:
     urlpatterns += static(
         settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0]
     )
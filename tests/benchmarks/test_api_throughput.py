@@ -0,0 +1,33 @@
+import time
+
+import pytest
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+DURATION = 1.0
+
+
+def requests_per_second(client, url):
+    client.get(url)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        client.get(url)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def test_api_feed_throughput(
+        mixer, user_client, user, published_category, published_location):
+    mixer.cycle(N_PER_PAGE * 2).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, text='Текст публикации. ' * 200)
+    html = requests_per_second(user_client, '/')
+    api = requests_per_second(user_client, '/api/posts/')
+    print(
+        f'\nЛента: HTML {html:.0f} запросов/с, JSON API {api:.0f} запросов/с'
+    )
+    assert api > html, (
+        'Убедитесь, что лента в JSON API отдаётся быстрее HTML-страницы.'
+    )
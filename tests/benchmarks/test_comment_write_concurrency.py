@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = [pytest.mark.benchmark]
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / 'blogicum'
+THREADS = 8
+COMMENTS_PER_THREAD = 20
+
+LOAD = '''
+import json, sys, threading, time
+
+import django
+from django.conf import settings
+
+mode, path, threads, per_thread = sys.argv[1:]
+threads, per_thread = int(threads), int(per_thread)
+database = settings.DATABASES['default']
+database['NAME'] = path
+if mode == 'default':
+    database['ENGINE'] = 'django.db.backends.sqlite3'
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, User
+
+setup_test_environment()
+call_command('migrate', verbosity=0)
+category = Category.objects.create(title='c', description='c', slug='c')
+users = [User.objects.create(username=f'user{i}') for i in range(threads)]
+post = Post.objects.create(
+    title='p', text='p', pub_date=timezone.now(), author=users[0],
+    category=category)
+connection.close()
+url = f'/posts/{post.id}/comment/'
+created = []
+errors = []
+
+
+def write_comments(user):
+    client = Client()
+    client.force_login(user)
+    for number in range(per_thread):
+        try:
+            response = client.post(url, {'text': f'comment {number}'})
+            (created if response.status_code == 302 else errors).append(1)
+        except Exception as error:
+            errors.append(repr(error))
+    connection.close()
+
+
+workers = [
+    threading.Thread(target=write_comments, args=(user,)) for user in users]
+start = time.perf_counter()
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+seconds = time.perf_counter() - start
+post.refresh_from_db()
+print(json.dumps({
+    'created': len(created),
+    'errors': len(errors),
+    'per_second': len(created) / seconds,
+    'comments': Comment.objects.count(),
+    'comment_count': post.comment_count,
+}))
+'''
+
+
+def run_load(mode, tmp_path):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='blogicum.settings.test')
+    return json.loads(subprocess.run(
+        [sys.executable, '-c', LOAD, mode, str(tmp_path / f'{mode}.sqlite3'),
+         str(THREADS), str(COMMENTS_PER_THREAD)],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout)
+
+
+def test_concurrent_comment_writes(tmp_path):
+    default = run_load('default', tmp_path)
+    tuned = run_load('tuned', tmp_path)
+    print(
+        f'\nКомментарии в {THREADS} потоков:'
+        f' стандартный SQLite {default["per_second"]:.0f}/с,'
+        f' ошибок {default["errors"]};'
+        f' WAL и BEGIN IMMEDIATE {tuned["per_second"]:.0f}/с,'
+        f' ошибок {tuned["errors"]}'
+    )
+    assert tuned['errors'] == 0, (
+        'Убедитесь, что одновременная запись комментариев'
+        ' не падает с ошибкой блокировки базы.'
+    )
+    assert tuned['created'] == THREADS * COMMENTS_PER_THREAD
+    assert tuned['comments'] == tuned['comment_count'] == tuned['created'], (
+        'Убедитесь, что счётчик комментариев не теряет обновления'
+        ' при одновременной записи.'
+    )
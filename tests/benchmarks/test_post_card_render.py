@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from blog.fragments import attach_card_versions
+from blog.views import get_posts
+from conftest import N_PER_PAGE
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark]
+
+ROUNDS = 20
+
+
+def render_page(posts):
+    return ''.join(
+        render_to_string('includes/post_card.html', {'post': post})
+        for post in posts
+    )
+
+
+def best_time(render):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_post_card_fragment_cache_speeds_up_page(
+        mixer, user, published_category, published_location):
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, text='Текст публикации. ' * 200)
+    posts = list(get_posts()[:N_PER_PAGE])
+
+    uncached = best_time(lambda: render_page(posts))
+
+    def render_cached():
+        cache.clear()
+        render_page(attach_card_versions(posts))
+
+    attach_card_versions(posts)
+    render_page(posts)
+    cached = best_time(lambda: render_page(posts))
+    cold = best_time(render_cached)
+    print(
+        f'\nКарточки {N_PER_PAGE} публикаций: без кеша {uncached * 1e3:.2f} мс,'
+        f' холодный кеш {cold * 1e3:.2f} мс,'
+        f' из кеша {cached * 1e3:.2f} мс'
+    )
+    assert cached < uncached, (
+        'Убедитесь, что отрисовка карточек из кеша фрагментов быстрее'
+        ' отрисовки без кеша.'
+    )
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+ROUNDS = 50
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+def session_overhead(settings, user, engine):
+    settings.SESSION_ENGINE = engine
+    client = Client()
+    client.force_login(user)
+    client.get('/pages/about/')
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            client.get('/pages/about/')
+        seconds = (time.perf_counter() - start) / ROUNDS
+    session_queries = sum(
+        'django_session' in query['sql'] for query in queries
+    ) / ROUNDS
+    return seconds, session_queries
+
+
+def test_session_overhead_per_request(settings, user):
+    results = {
+        engine.rsplit('.', 1)[1]: session_overhead(settings, user, engine)
+        for engine in ENGINES
+    }
+    print('\nСессии на один запрос:')
+    for name, (seconds, queries) in results.items():
+        print(f'  {name}: {seconds * 1000:.2f} мс, запросов {queries:.1f}')
+    assert results['db'][1] == 1
+    assert results['cached_db'][1] == 0, (
+        'Убедитесь, что сессия из кеша не читается из базы на каждый запрос.'
+    )
+    assert results['signed_cookies'][1] == 0
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / 'blogicum'
+# Запас на медленные машины CI; локально импорт занимает доли секунды.
+IMPORT_TIME_BUDGET = 3.0
+RUNS = 3
+
+MEASURE = '''
+import json, sys, time
+start = time.perf_counter()
+import blogicum.wsgi
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'debug_toolbar': 'debug_toolbar' in sys.modules,
+}))
+'''
+
+
+def import_wsgi(django_env, runs=RUNS):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='blogicum.settings',
+        DJANGO_ENV=django_env,
+    )
+    results = [
+        json.loads(subprocess.run(
+            [sys.executable, '-c', MEASURE], cwd=PROJECT_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout)
+        for _ in range(runs)
+    ]
+    return min(result['seconds'] for result in results), results[0]
+
+
+def test_debug_toolbar_only_in_dev():
+    _, prod = import_wsgi('prod', runs=1)
+    _, dev = import_wsgi('dev', runs=1)
+    assert not prod['debug_toolbar'], (
+        'Убедитесь, что в боевом окружении debug_toolbar не импортируется.'
+    )
+    assert dev['debug_toolbar']
+
+
+@pytest.mark.benchmark
+def test_wsgi_import_time():
+    prod_seconds, _ = import_wsgi('prod')
+    dev_seconds, _ = import_wsgi('dev')
+    print(
+        f'\nИмпорт blogicum.wsgi: prod {prod_seconds * 1000:.0f} мс,'
+        f' dev {dev_seconds * 1000:.0f} мс'
+    )
+    assert prod_seconds < IMPORT_TIME_BUDGET, (
+        'Убедитесь, что импорт blogicum.wsgi не стал заметно медленнее.'
+    )
@@ -10,6 +10,7 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +33,13 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -83,10 +91,27 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.images",
     "adapters.comment",
 ]
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark", action="store_true",
+        help="Запустить замеры времени, помеченные benchmark.",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="замер времени: запустите с --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def mixer():
     return _mixer
@@ -354,6 +379,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".jpeg")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,45 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+
+def image_bytes(size=(100, 100), mode='RGB', image_format='JPEG',
+                color=0, **save_options):
+    """Содержимое файла изображения, созданного Pillow."""
+    buffer = BytesIO()
+    Image.new(mode, size, color=color).save(
+        buffer, format=image_format, **save_options)
+    return buffer.getvalue()
+
+
+def post_form_data(category, image=None, **fields):
+    """Данные формы создания и редактирования публикации."""
+    data = {
+        'title': 'Фото',
+        'text': 'Текст',
+        'pub_date': '2020-01-01',
+        'is_published': True,
+        'category': category.id,
+        **fields,
+    }
+    if image is not None:
+        data['image'] = image
+    return data
+
+
+@pytest.fixture
+def make_image_upload():
+    """
+    Фабрика загружаемых изображений. Содержимое можно передать готовым,
+    иначе оно создаётся image_bytes с переданными параметрами.
+    """
+    def make_image_upload(content=None, **image):
+        image_format = image.get('image_format', 'JPEG').lower()
+        if content is None:
+            content = image_bytes(**image)
+        return SimpleUploadedFile(
+            f'photo.{image_format}', content,
+            content_type=f'image/{image_format}')
+    return make_image_upload
@@ -104,6 +104,24 @@ def many_posts_with_published_locations(
     )
 
 
+@pytest.fixture
+def make_posts(mixer: Mixer, published_category):
+    """
+    Фабрика опубликованных вчера публикаций в опубликованной категории,
+    без местоположения и изображения. Поля можно переопределить.
+    """
+    def make_posts(count, **fields):
+        return mixer.cycle(count).blend("blog.Post", **{
+            "category": published_category,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            "location": None,
+            "image": "",
+            **fields,
+        })
+    return make_posts
+
+
 @pytest.fixture
 def post_comment_context_form_item(
     user_client: Client, post_with_published_location
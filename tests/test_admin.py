@@ -0,0 +1,157 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST_QUERY_BUDGET = 8
+
+
+@pytest.fixture
+def admin_client():
+    admin = get_user_model().objects.create_superuser(
+        'admin', 'admin@example.com', 'password')
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+@pytest.fixture
+def make_listed_posts(make_posts, published_location):
+    def make_listed_posts(count):
+        return make_posts(
+            count, location=published_location,
+            text='Очень длинный текст публикации. ' * 100)
+    return make_listed_posts
+
+
+def get_page_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(queries.captured_queries)
+
+
+@pytest.mark.parametrize('url, model', (
+    ('/admin/blog/post/', 'blog.Post'),
+    ('/admin/blog/comment/', 'blog.Comment'),
+))
+def test_changelist_query_count_does_not_grow_with_rows(
+        admin_client, make_listed_posts, mixer, url, model):
+    posts = make_listed_posts(30)
+    if model == 'blog.Comment':
+        mixer.cycle(30).blend(
+            'blog.Comment', post=(post for post in posts),
+            author=(post.author for post in posts))
+    _, queries = get_page_queries(admin_client, url)
+    assert queries <= CHANGELIST_QUERY_BUDGET, (
+        f'Убедитесь, что список `{url}` загружается не более чем за'
+        f' {CHANGELIST_QUERY_BUDGET} запросов к базе данных.'
+    )
+    posts = make_listed_posts(30)
+    if model == 'blog.Comment':
+        mixer.cycle(30).blend(
+            'blog.Comment', post=(post for post in posts),
+            author=(post.author for post in posts))
+    _, more_queries = get_page_queries(admin_client, url)
+    assert more_queries <= queries, (
+        f'Убедитесь, что число запросов списка `{url}` не зависит'
+        ' от количества строк.'
+    )
+
+
+def test_post_changelist_renders_compact_rows(
+        admin_client, make_listed_posts):
+    make_listed_posts(3)
+    response = admin_client.get('/admin/blog/post/')
+    content = response.content.decode()
+    assert 'name="form-0-author"' not in content, (
+        'Убедитесь, что автор, категория и местоположение не редактируются'
+        ' в списке публикаций выпадающими списками.'
+    )
+    assert 'Очень длинный текст публикации. ' * 3 not in content, (
+        'Убедитесь, что в списке публикаций текст сокращается.'
+    )
+    assert response.context['cl'].full_result_count is None, (
+        'Убедитесь, что список публикаций не считает все строки таблицы'
+        ' при каждом запросе.'
+    )
+
+
+def test_changelist_count_is_cached(admin_client, make_listed_posts):
+    make_listed_posts(3)
+    admin_client.get('/admin/blog/post/')
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get('/admin/blog/post/')
+    assert response.context['cl'].result_count == 3
+    assert not any(
+        'COUNT(' in query['sql'] for query in queries.captured_queries), (
+        'Убедитесь, что количество строк списка берётся из кеша.'
+    )
+    make_listed_posts(2)
+    response = admin_client.get('/admin/blog/post/')
+    assert response.context['cl'].result_count == 5, (
+        'Убедитесь, что кешированное количество строк сбрасывается'
+        ' при добавлении публикаций.'
+    )
+
+
+@pytest.mark.parametrize('model, fk', (
+    ('blog.Category', 'category'),
+    ('blog.Location', 'location'),
+))
+def test_post_inline_is_paginated(admin_client, mixer, model, fk):
+    parent = mixer.blend(model, is_published=True)
+    url = f'/admin/blog/{fk}/{parent.pk}/change/'
+    mixer.cycle(5).blend('blog.Post', image='', **{fk: parent})
+    _, queries = get_page_queries(admin_client, url)
+    posts = mixer.cycle(40).blend('blog.Post', image='', **{fk: parent})
+    response, more_queries = get_page_queries(admin_client, url)
+    assert more_queries <= queries, (
+        'Убедитесь, что число запросов страницы изменения не зависит'
+        ' от количества публикаций.'
+    )
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert [form.instance for form in formset] == posts[::-1][:20], (
+        'Убедитесь, что встроенный список показывает одну страницу'
+        ' публикаций, начиная с новых.'
+    )
+    content = response.content.decode()
+    assert 'Всего: 45' in content
+    assert f'/admin/blog/post/?{fk}__id__exact={parent.pk}' in content, (
+        'Убедитесь, что встроенный список ссылается на список публикаций'
+        ' с фильтром.'
+    )
+    response = admin_client.get(f'{url}?posts_page=3')
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == 5
+
+
+def test_category_with_post_inline_saves(admin_client, mixer):
+    category = mixer.blend('blog.Category', is_published=True)
+    mixer.cycle(25).blend('blog.Post', image='', category=category)
+    url = f'/admin/blog/category/{category.pk}/change/'
+    formset = admin_client.get(url).context[
+        'inline_admin_formsets'][0].formset
+    data = {
+        'title': 'Новое название',
+        'description': category.description,
+        'slug': category.slug,
+        'is_published': 'on',
+    }
+    data.update({
+        f'{formset.prefix}-{key}': value
+        for key, value in formset.management_form.initial.items()
+    })
+    for number, form in enumerate(formset):
+        data[f'{formset.prefix}-{number}-id'] = form.instance.pk
+        data[f'{formset.prefix}-{number}-category'] = category.pk
+    response = admin_client.post(url, data)
+    assert response.status_code == 302, (
+        'Убедитесь, что категорию со встроенным списком публикаций'
+        ' можно сохранить.'
+    )
+    category.refresh_from_db()
+    assert category.title == 'Новое название'
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from blog.views import get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_api_feed_pages_through_posts(
+        client, many_posts_with_published_locations):
+    response = client.get('/api/posts/')
+    data = response.json()
+    ids = [post['id'] for post in data['results']]
+    while data['next']:
+        data = client.get(f"/api/posts/?cursor={data['next']}").json()
+        ids.extend(post['id'] for post in data['results'])
+    assert ids == list(get_posts().values_list('id', flat=True)), (
+        'Убедитесь, что лента API возвращает опубликованные публикации'
+        ' по одному разу в порядке «от новых к старым».'
+    )
+
+
+def test_api_fields_selection(client, post_with_published_location):
+    data = client.get('/api/posts/?fields=id,title,author').json()
+    assert data['results'] == [{
+        'id': post_with_published_location.id,
+        'title': post_with_published_location.title,
+        'author': post_with_published_location.author.username,
+    }], (
+        'Убедитесь, что API возвращает только поля, указанные в ?fields=.'
+    )
+
+
+def test_api_hides_unpublished_posts(
+        client, user_client, unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    assert client.get('/api/posts/').json()['results'] == []
+    assert client.get(
+        f'/api/posts/{post.id}/').status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что API не отдаёт снятые с публикации публикации'
+        ' другим пользователям.'
+    )
+    assert user_client.get(
+        f'/api/posts/{post.id}/').status_code == HTTPStatus.OK, (
+        'Убедитесь, что API отдаёт автору его неопубликованные публикации.'
+    )
+    profile_posts = user_client.get(
+        f'/api/profile/{post.author.username}/posts/').json()['results']
+    assert len(profile_posts) == len(
+        unpublished_posts_with_published_locations)
+
+
+def test_api_category_and_comments(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    data = client.get(f'/api/category/{post.category.slug}/posts/').json()
+    assert [item['id'] for item in data['results']] == [post.id]
+    data = client.get(f'/api/posts/{post.id}/comments/').json()
+    assert [item['id'] for item in data['results']] == [
+        comment.id for comment in comments], (
+        'Убедитесь, что API возвращает комментарии публикации в порядке'
+        ' их добавления.'
+    )
+
+
+def test_api_etag(mixer, client, post_with_published_location):
+    etag = client.get('/api/posts/')['ETag']
+    response = client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что API отвечает 304 на запрос с актуальным ETag.'
+    )
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    response = client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_api_page_query_count(
+        client, many_posts_with_published_locations,
+        django_assert_num_queries):
+    with django_assert_num_queries(2):
+        data = client.get('/api/posts/').json()
+    assert len(data['results']) == len(many_posts_with_published_locations), (
+        'Убедитесь, что страница API выбирается одним запросом без'
+        ' подсчёта общего количества публикаций.'
+    )
@@ -0,0 +1,193 @@
+import pytest
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.db.models.signals import post_delete
+
+from blog import bulk
+from blog.bulk import delete_comments
+from blog.models import Comment, Post, User
+from blog.search import comment_index
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def deleted_comments():
+    deleted = []
+
+    def receiver(sender, instance, **kwargs):
+        deleted.append(instance)
+
+    post_delete.connect(receiver, sender=Comment, weak=False)
+    yield deleted
+    post_delete.disconnect(receiver, sender=Comment)
+
+
+def run_action(client, url, action, objects, **data):
+    response = client.post(url, {
+        'action': action,
+        '_selected_action': [obj.pk for obj in objects],
+        **data,
+    })
+    assert response.status_code == 302
+    return [str(message) for message in get_messages(response.wsgi_request)]
+
+
+def get_feed_ids(client, url):
+    return {post.id for post in client.get(url).context['page_obj']}
+
+
+def test_publish_actions_refresh_feeds(client, admin_client, make_posts):
+    posts = make_posts(3, is_published=False)
+    assert get_feed_ids(client, '/') == set()
+    messages = run_action(admin_client, '/admin/blog/post/', 'publish', posts)
+    assert any('Опубликовано публикаций: 3.' in message
+               and 'Заняло' in message for message in messages), (
+        'Убедитесь, что действие публикации сообщает количество'
+        ' и время выполнения.'
+    )
+    assert get_feed_ids(client, '/') == {post.id for post in posts}, (
+        'Убедитесь, что после массовой публикации лента обновляется.'
+    )
+    run_action(admin_client, '/admin/blog/post/', 'unpublish', posts[:2])
+    page = client.get('/').context['page_obj']
+    assert {post.id for post in page} == {posts[2].id}
+    assert page.paginator.count == 1, (
+        'Убедитесь, что массовые действия сбрасывают количество'
+        ' публикаций ленты.'
+    )
+
+
+def test_move_to_category_action(client, admin_client, mixer,
+                                 published_category, make_posts):
+    posts = make_posts(2)
+    target = mixer.blend('blog.Category', is_published=True)
+    old_url = f'/category/{published_category.slug}/'
+    new_url = f'/category/{target.slug}/'
+    assert get_feed_ids(client, old_url) == {post.id for post in posts}
+    assert get_feed_ids(client, new_url) == set()
+    messages = run_action(
+        admin_client, '/admin/blog/post/', 'move_to_category', posts,
+        category=target.pk)
+    assert any('Перенесено публикаций: 2.' in message
+               for message in messages)
+    assert get_feed_ids(client, old_url) == set()
+    assert get_feed_ids(client, new_url) == {post.id for post in posts}, (
+        'Убедитесь, что действие переноса обновляет ленты категорий.'
+    )
+    messages = run_action(
+        admin_client, '/admin/blog/post/', 'move_to_category', posts)
+    assert any('Выберите категорию' in message for message in messages)
+
+
+def test_delete_comments_is_set_based(
+        client, mixer, make_posts, deleted_comments):
+    posts = make_posts(2)
+    spam = mixer.cycle(5).blend(
+        'blog.Comment', post=(posts[number % 2] for number in range(5)),
+        text='Спам')
+    kept = mixer.blend('blog.Comment', post=posts[0], text='Отзыв')
+    client.get(f'/posts/{posts[0].id}/')
+    deleted = delete_comments(
+        Comment.objects.filter(pk__in=[comment.pk for comment in spam]),
+        batch_size=2)
+    assert deleted == 5
+    assert not deleted_comments, (
+        'Убедитесь, что массовое удаление комментариев не загружает'
+        ' их по одному.'
+    )
+    assert list(Comment.objects.all()) == [kept]
+    counts = dict(Post.objects.values_list('pk', 'comment_count'))
+    assert counts == {posts[0].pk: 1, posts[1].pk: 0}, (
+        'Убедитесь, что массовое удаление обновляет счётчики комментариев.'
+    )
+    assert client.get(
+        f'/posts/{posts[0].id}/').context['post'].comment_count == 1
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {comment_index.table}')
+        assert cursor.fetchone()[0] == 1, (
+            'Убедитесь, что удалённые комментарии убираются из индекса.'
+        )
+
+
+def test_purge_author_comments_action(
+        admin_client, mixer, make_posts, deleted_comments):
+    post, = make_posts(1)
+    spammer, reader = mixer.cycle(2).blend(User)
+    spam = mixer.cycle(4).blend('blog.Comment', post=post, author=spammer)
+    mixer.blend('blog.Comment', post=post, author=reader)
+    admin_client.get('/admin/blog/comment/')
+    messages = run_action(
+        admin_client, '/admin/blog/comment/', 'purge_author_comments',
+        spam[:1])
+    assert any('Удалено комментариев: 4.' in message
+               for message in messages)
+    assert list(Comment.objects.values_list('author', flat=True)) == [
+        reader.pk]
+    assert not deleted_comments
+    response = admin_client.get('/admin/blog/comment/')
+    assert response.context['cl'].result_count == 1, (
+        'Убедитесь, что массовое удаление сбрасывает кешированное'
+        ' количество строк списка.'
+    )
+
+
+def test_purge_author_comments_runs_every_batch(
+        admin_client, mixer, make_posts, monkeypatch):
+    monkeypatch.setattr(bulk, 'BATCH_SIZE', 2)
+    post, = make_posts(1)
+    spammer = mixer.blend(User)
+    spam = mixer.cycle(5).blend('blog.Comment', post=post, author=spammer)
+    messages = run_action(
+        admin_client, '/admin/blog/comment/', 'purge_author_comments',
+        spam[:1])
+    assert any('Удалено комментариев: 5.' in message
+               for message in messages)
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что действие удаляет комментарии авторов'
+        ' во всех пачках, а не только в первой.'
+    )
+
+
+def test_delete_user_with_comments(
+        admin_client, mixer, make_posts, deleted_comments):
+    author, commenter = mixer.cycle(2).blend(User)
+    own_post, = make_posts(1, author=author)
+    other_post, = make_posts(1)
+    mixer.cycle(3).blend('blog.Comment', post=other_post, author=commenter)
+    mixer.cycle(2).blend('blog.Comment', post=own_post, author=author)
+    url = f'/admin/auth/user/{commenter.pk}/delete/'
+    content = admin_client.get(url).content.decode()
+    assert 'Комментарии: 3' in content, (
+        'Убедитесь, что страница подтверждения удаления показывает'
+        ' количество удаляемых комментариев.'
+    )
+    assert admin_client.post(url, {'post': 'yes'}).status_code == 302
+    assert not User.objects.filter(pk=commenter.pk).exists()
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 0, (
+        'Убедитесь, что удаление пользователя обновляет счётчики'
+        ' комментариев его публикаций.'
+    )
+    run_action(admin_client, '/admin/auth/user/', 'delete_selected',
+               [author], post='yes')
+    assert not Post.objects.filter(pk=own_post.pk).exists()
+    assert not Comment.objects.exists()
+    assert not deleted_comments, (
+        'Убедитесь, что комментарии удаляемых пользователей'
+        ' удаляются без загрузки в память.'
+    )
+
+
+def test_author_deletes_post_with_comments(
+        user, user_client, mixer, make_posts, deleted_comments):
+    post, = make_posts(1, author=user)
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == 302
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert not Comment.objects.exists()
+    assert not deleted_comments, (
+        'Убедитесь, что комментарии удаляемой публикации удаляются'
+        ' без загрузки в память и сигналов на каждый комментарий.'
+    )
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from blog import cache as blog_cache
+from blog.cache import CacheNamespace
+from blog.paginators import get_published_category
+
+
+def file_cache(tmp_path):
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }
+
+
+def redis_cache(tmp_path):
+    pytest.importorskip('fakeredis')
+    return {
+        'BACKEND': 'blogicum.cache_backends.RedisCache',
+        'LOCATION': 'redis://localhost:6379/0',
+        'OPTIONS': {'CLIENT_CLASS': 'fakeredis.FakeRedis'},
+    }
+
+
+def locmem_cache(tmp_path):
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': str(tmp_path),
+    }
+
+
+@pytest.fixture(params=(locmem_cache, file_cache, redis_cache))
+def cache_backend(request, tmp_path):
+    with override_settings(CACHES={'default': request.param(tmp_path)}):
+        yield
+
+
+@pytest.mark.usefixtures('cache_backend')
+def test_namespace_invalidation():
+    posts = CacheNamespace('test-posts')
+    users = CacheNamespace('test-users')
+    posts.set(('feed', 1), 'posts')
+    users.set(('feed', 1), 'users')
+    posts.set_many({'a': 1, 'b': [2]})
+    assert posts.get(('feed', 1)) == 'posts'
+    assert posts.get_many(['a', 'b', 'c']) == {'a': 1, 'b': [2]}
+    posts.invalidate()
+    assert posts.get(('feed', 1)) is None, (
+        'Убедитесь, что invalidate() делает устаревшими записи пространства.'
+    )
+    assert posts.get_many(['a', 'b']) == {}
+    assert users.get(('feed', 1)) == 'users', (
+        'Убедитесь, что invalidate() не затрагивает другие пространства.'
+    )
+
+
+@pytest.mark.usefixtures('cache_backend')
+def test_get_or_set_options():
+    namespace = CacheNamespace('test-options')
+    assert namespace.get_or_set('empty', lambda: '', cache_if=bool) == ''
+    assert namespace.get('empty') is None
+    assert namespace.get_or_set(
+        'value', lambda: 'computed', timeout=lambda value: 60) == 'computed'
+    assert namespace.get_or_set('value', lambda: 'again') == 'computed'
+
+
+def test_concurrent_misses_compute_once():
+    namespace = CacheNamespace('test-stampede')
+    calls = []
+    results = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def worker():
+        start.wait()
+        results.append(namespace.get_or_set('key', compute, 60))
+
+    namespace.get_version()
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1, (
+        'Убедитесь, что при одновременных промахах значение'
+        ' вычисляет только один процесс.'
+    )
+    assert results == ['value'] * 8
+
+
+def test_waiters_stop_when_lock_is_released_without_value():
+    namespace = CacheNamespace('test-uncached')
+    results = []
+    start = threading.Barrier(4)
+
+    def compute():
+        time.sleep(0.2)
+        return ''
+
+    def worker():
+        start.wait()
+        results.append(namespace.get_or_set('key', compute, 60, bool))
+
+    namespace.get_version()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started < namespace.wait_timeout / 2, (
+        'Убедитесь, что ожидающие процессы не ждут полный срок,'
+        ' если держатель блокировки не сохранил значение.'
+    )
+    assert results == [''] * 4
+
+
+def test_early_recompute_serves_stale_value(monkeypatch):
+    namespace = CacheNamespace('test-early')
+    namespace.cache.set(
+        namespace.make_key('key'),
+        ('stale', time.time() + 1, 10), None)
+    monkeypatch.setattr(blog_cache.random, 'random', lambda: 0.99)
+    lock_key = f"{namespace.make_key('key')}:lock"
+    namespace.cache.add(lock_key, 1, 10)
+    assert namespace.get_or_set('key', lambda: 'fresh', 60) == 'stale', (
+        'Убедитесь, что пока значение пересчитывает другой процесс,'
+        ' отдаётся прежнее.'
+    )
+    namespace.cache.delete(lock_key)
+    assert namespace.get_or_set('key', lambda: 'fresh', 60) == 'fresh', (
+        'Убедитесь, что значение пересчитывается до истечения срока.'
+    )
+    monkeypatch.setattr(blog_cache.random, 'random', lambda: 0.0)
+    assert namespace.get_or_set('key', lambda: 'newer', 60) == 'fresh'
+
+
+@pytest.mark.django_db
+def test_missing_category_is_cached(mixer):
+    with pytest.raises(Http404):
+        get_published_category('missing')
+    with CaptureQueriesContext(connection) as queries:
+        with pytest.raises(Http404):
+            get_published_category('missing')
+    assert not queries.captured_queries, (
+        'Убедитесь, что отсутствие категории тоже кешируется.'
+    )
+    category = mixer.blend(
+        'blog.Category', slug='missing', is_published=True)
+    assert get_published_category('missing') == category, (
+        'Убедитесь, что изменение категорий сбрасывает кеш категорий.'
+    )
@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что при создании комментария увеличивается счётчик'
+        ' комментариев публикации.'
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при удалении комментария уменьшается счётчик'
+        ' комментариев публикации.'
+    )
+    post.comments.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что при массовом удалении комментариев счётчик'
+        ' комментариев публикации обновляется.'
+    )
+
+
+def test_comment_count_follows_moved_comment(
+        mixer: Mixer, post_with_published_location, post_of_another_author):
+    comment = mixer.blend('blog.Comment', post=post_with_published_location)
+    comment.post = post_of_another_author
+    comment.save()
+    post_with_published_location.refresh_from_db()
+    post_of_another_author.refresh_from_db()
+    assert (
+        post_with_published_location.comment_count,
+        post_of_another_author.comment_count,
+    ) == (0, 1), (
+        'Убедитесь, что при переносе комментария в другую публикацию'
+        ' счётчики комментариев обеих публикаций обновляются.'
+    )
+
+
+def test_recount_comments_command(
+        mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    type(post).objects.update(comment_count=100)
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` пересчитывает счётчик'
+        ' комментариев публикаций.'
+    )
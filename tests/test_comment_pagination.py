@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from blog import views
+from blog.paginators import CursorPaginator
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+PER_PAGE = 5
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location, monkeypatch):
+    monkeypatch.setattr(views, 'COMMENTS_PER_PAGE', PER_PAGE)
+    return mixer.cycle(PER_PAGE * 2 + 2).blend(
+        'blog.Comment', post=post_with_published_location,
+        created_at=timezone.now())
+
+
+def test_post_detail_shows_first_comments_page(
+        client, post_with_published_location, many_comments):
+    response = client.get(f'/posts/{post_with_published_location.id}/')
+    comments = list(response.context['comments'])
+    assert comments == many_comments[:PER_PAGE], (
+        'Убедитесь, что на странице публикации показывается только первая'
+        ' страница комментариев.'
+    )
+
+
+def test_comments_endpoint_pages_through_comments(
+        client, post_with_published_location, many_comments):
+    url = f'/posts/{post_with_published_location.id}/comments/'
+    response = client.get(url)
+    seen = list(response.context['comments'])
+    while response.context['comments'].has_next():
+        response = client.get(
+            f"{url}?cursor={response.context['comments'].next_cursor}")
+        seen.extend(response.context['comments'])
+    assert seen == many_comments, (
+        'Убедитесь, что подгрузка комментариев возвращает все комментарии'
+        ' по одному разу в порядке их добавления.'
+    )
+
+
+def test_comments_endpoint_hides_unpublished_post(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что комментарии к снятой с публикации публикации'
+        ' недоступны другим пользователям.'
+    )
+
+
+def test_comments_page_uses_index(post_with_published_location):
+    paginator = CursorPaginator(
+        post_with_published_location.comments.all(), PER_PAGE,
+        ordering=('created_at', 'pk'))
+    plan = paginator._seek([timezone.now(), 1], after=True).order_by(
+        *paginator.ordering)[:PER_PAGE + 1].explain()
+    assert 'comment_post_created_idx' in plan, (
+        'Убедитесь, что страница комментариев выбирается по индексу.'
+        f' План запроса:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Убедитесь, что страница комментариев сортируется по индексу.'
+        f' План запроса:\n{plan}'
+    )
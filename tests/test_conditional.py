@@ -0,0 +1,150 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from blog import page_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    'url', ['/', '/posts/{post.id}/', '/category/{post.category.slug}/'],
+)
+def test_not_modified_until_comment_added(
+        mixer, user_client, post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(post=post)
+    etag = user_client.get(url)['ETag']
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что на запрос с актуальным ETag страница отвечает 304.'
+    )
+    mixer.blend('blog.Comment', post=post)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ETag страницы меняется при добавлении комментария.'
+    )
+
+
+def test_if_modified_since(user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    last_modified = user_client.get(url)['Last-Modified']
+    response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что на запрос с актуальной датой изменения страница'
+        ' публикации отвечает 304.'
+    )
+
+
+def delete_post(post):
+    post.delete()
+
+
+def unpublish_category(post):
+    post.category.is_published = False
+    post.category.save()
+
+
+def rename_author(post):
+    post.author.username = 'renamed'
+    post.author.save()
+
+
+@pytest.mark.parametrize(
+    'change', (delete_post, unpublish_category, rename_author))
+@pytest.mark.parametrize('url', ['/', '/category/{post.category.slug}/'])
+def test_feed_last_modified_moves_on_change(
+        monkeypatch, another_user_client, post_with_published_location,
+        url, change):
+    post = post_with_published_location
+    url = url.format(post=post)
+    last_modified = another_user_client.get(url)['Last-Modified']
+    # Изменение происходит позже, чем в ту же секунду.
+    monkeypatch.setattr(
+        page_cache, 'new_version', lambda: time.time_ns() + 5 * 10 ** 9)
+    change(post)
+    response = another_user_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code != HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что дата изменения ленты меняется при удалении'
+        ' публикации, снятии категории с публикации и изменении автора.'
+    )
+
+
+def rename_commenter(post):
+    comment = post.comments.get()
+    comment.author.username = 'renamed'
+    comment.author.save()
+
+
+@pytest.mark.parametrize('change', (rename_author, rename_commenter))
+def test_post_etag_changes_on_rename(
+        mixer, another_user_client, post_with_published_location, change):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post)
+    url = f'/posts/{post.id}/'
+    etag = another_user_client.get(url)['ETag']
+    change(post)
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ETag страницы публикации меняется при изменении'
+        ' имени автора публикации или комментария.'
+    )
+
+
+@pytest.mark.parametrize('url', ['/', '/category/{post.category.slug}/'])
+def test_feed_validators_do_not_query_posts(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries, url):
+    url = url.format(post=post_with_published_location)
+    etag = user_client.get(url)['ETag']
+    with django_assert_max_num_queries(3) as context:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not any(
+        'blog_post' in query['sql'] for query in context.captured_queries
+    ), (
+        'Убедитесь, что проверка актуальности ленты не обращается'
+        ' к таблице публикаций.'
+    )
+
+
+def test_not_modified_skips_rendering(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries):
+    etag = user_client.get('/')['ETag']
+    with django_assert_max_num_queries(3):
+        user_client.get('/', HTTP_IF_NONE_MATCH=etag)
+
+
+def test_cached_anonymous_page_not_modified(
+        client, post_with_published_location, django_assert_num_queries):
+    etag = client.get('/')['ETag']
+    with django_assert_num_queries(0):
+        response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что закешированная страница отвечает 304 на запрос'
+        ' с актуальным ETag.'
+    )
+
+
+def test_etag_differs_between_users(
+        user_client, another_user_client, post_with_published_location):
+    assert user_client.get('/')['ETag'] != another_user_client.get(
+        '/')['ETag'], (
+        'Убедитесь, что ETag страницы зависит от пользователя.'
+    )
+
+
+def test_comment_edit_updates_post(mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    updated_at = post.updated_at
+    comment.text = 'Изменённый текст'
+    comment.save()
+    post.refresh_from_db()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что изменение комментария обновляет время изменения'
+        ' публикации.'
+    )
@@ -0,0 +1,47 @@
+import pytest
+from blog.models import Post
+from blog.paginators import CursorPaginator
+from blog.views import get_posts
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    ('get_queryset', 'index_name'),
+    [
+        (lambda: get_posts(), 'post_published_feed_idx'),
+        (lambda: get_posts(Post.objects.filter(category_id=1)),
+         'post_category_feed_idx'),
+        (lambda: get_posts(Post.objects.filter(author_id=1), filter=False),
+         'post_author_feed_idx'),
+        (lambda: get_posts(Post.objects.filter(author_id=1)),
+         'post_author_feed_idx'),
+    ],
+    ids=['global feed', 'category feed', 'own profile feed',
+         'profile feed'],
+)
+def test_feed_queries_use_indexes(get_queryset, index_name):
+    plan = get_queryset()[:10].explain()
+    assert index_name in plan, (
+        f'Убедитесь, что запрос ленты использует индекс `{index_name}`.'
+        f' План запроса:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Убедитесь, что лента публикаций сортируется по индексу, а не'
+        f' отдельной сортировкой. План запроса:\n{plan}'
+    )
+
+
+def test_cursor_page_uses_index():
+    paginator = CursorPaginator(get_posts(), 10)
+    plan = paginator._seek([timezone.now(), 1], after=True).order_by(
+        *paginator.ordering)[:11].explain()
+    assert 'post_published_feed_idx' in plan, (
+        'Убедитесь, что страница ленты по курсору выбирается по индексу.'
+        f' План запроса:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Убедитесь, что страница ленты по курсору сортируется по индексу.'
+        f' План запроса:\n{plan}'
+    )
@@ -0,0 +1,83 @@
+from io import BytesIO, StringIO
+
+import pytest
+from blog.jobs import enqueue, run_pending
+from blog.models import Job, Post
+from django.core.management import call_command
+from fixtures.images import image_bytes, post_form_data
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+PROCESSING_TEXT = 'Изображение обрабатывается'
+
+
+def exif_jpeg():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой.
+    exif[0x010F] = 'Camera'
+    return image_bytes((200, 100), exif=exif.tobytes())
+
+
+def create_post(client, category, image):
+    client.post('/posts/create/', data=post_form_data(category, image))
+    return Post.objects.get(title='Фото')
+
+
+def test_image_is_processed_by_worker(
+        settings, user_client, published_category, make_image_upload):
+    settings.JOBS_RUN_INLINE = False
+    post = create_post(
+        user_client, published_category, make_image_upload(exif_jpeg()))
+    assert post.image_processing and not post.renditions.exists(), (
+        'Убедитесь, что изображение обрабатывается не в запросе'
+        ' создания публикации.'
+    )
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert PROCESSING_TEXT in content, (
+        'Убедитесь, что пока изображение обрабатывается,'
+        ' на странице публикации показывается заглушка.'
+    )
+
+    call_command('run_jobs', once=True, stdout=StringIO())
+
+    post.refresh_from_db()
+    assert not post.image_processing
+    assert post.renditions.exists()
+    with post.image.open('rb') as image_file, Image.open(image_file) as image:
+        assert image.size == (100, 200), (
+            'Убедитесь, что изображение поворачивается по EXIF.')
+        assert not image.getexif(), (
+            'Убедитесь, что из изображения удаляются метаданные EXIF.')
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert PROCESSING_TEXT not in content
+    assert Job.objects.get().status == Job.DONE
+
+
+def test_broken_image_is_removed(
+        user_client, published_category, make_image_upload):
+    buffer = BytesIO()
+    Image.effect_noise((200, 200), 64).convert('RGB').save(buffer, 'JPEG')
+    truncated = buffer.getvalue()[:len(buffer.getvalue()) // 2]
+    post = create_post(
+        user_client, published_category, make_image_upload(truncated))
+    assert not post.image and not post.image_processing, (
+        'Убедитесь, что файл, который не удалось прочитать'
+        ' как изображение, удаляется из публикации.'
+    )
+
+
+def failing_task():
+    raise RuntimeError('boom')
+
+
+def test_failed_job_is_retried(settings):
+    settings.JOBS_RUN_INLINE = False
+    settings.JOBS_MAX_ATTEMPTS = 2
+    settings.JOBS_RETRY_DELAY = 0
+    job = enqueue(failing_task)
+    assert run_pending() == 2
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+    assert 'RuntimeError: boom' in job.error
@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from blog.models import Post, StoredFile
+from django.core.management import call_command
+from fixtures.images import post_form_data
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def refcount(post):
+    return StoredFile.objects.get(name=post.image.name).refcount
+
+
+def test_image_refcount(user_client, published_category, make_image_upload):
+    for title in ('Первая', 'Вторая'):
+        user_client.post('/posts/create/', data=post_form_data(
+            published_category, make_image_upload(color='red'), title=title))
+    first, second = Post.objects.order_by('pk')
+    assert refcount(first) == 2, (
+        'Убедитесь, что у одинаковых изображений ведётся счётчик ссылок.'
+    )
+    old_name = first.image.name
+    user_client.post(f'/posts/{first.id}/edit/', data=post_form_data(
+        published_category, make_image_upload(color='blue'), title='Первая'))
+    first.refresh_from_db()
+    assert refcount(first) == 1
+    assert StoredFile.objects.get(name=old_name).refcount == 1
+    second.delete()
+    assert StoredFile.objects.get(name=old_name).refcount == 0
+
+
+def test_gc_images_removes_unreferenced_files(
+        user_client, published_category, make_image_upload):
+    user_client.post('/posts/create/', data=post_form_data(
+        published_category, make_image_upload(color='red')))
+    post = Post.objects.get()
+    old_name = post.image.name
+    user_client.post(f'/posts/{post.id}/edit/', data=post_form_data(
+        published_category, make_image_upload(color='blue')))
+    post.refresh_from_db()
+    storage = post.image.storage
+
+    stdout = StringIO()
+    call_command(
+        'gc_images', dry_run=True, grace=0, verbosity=2, stdout=stdout)
+    assert old_name in stdout.getvalue()
+    assert post.image.name not in stdout.getvalue()
+    assert storage.exists(old_name), (
+        'Убедитесь, что `gc_images --dry-run` не удаляет файлы.'
+    )
+
+    call_command('gc_images', grace=0, stdout=StringIO())
+    assert not storage.exists(old_name), (
+        'Убедитесь, что `gc_images` удаляет файлы без ссылок.'
+    )
+    assert storage.exists(post.image.name)
+    assert not StoredFile.objects.filter(name=old_name).exists()
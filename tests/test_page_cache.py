@@ -0,0 +1,79 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_page_is_cached(
+        client, post_with_published_location, django_assert_num_queries):
+    url = f'/posts/{post_with_published_location.id}/'
+    content = client.get(url).content
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.content == content, (
+        'Убедитесь, что страница для анонимного пользователя отдаётся'
+        ' из кеша.'
+    )
+
+
+def test_authenticated_page_is_not_cached(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    user_client.get(url)
+    type(post).objects.filter(pk=post.pk).update(title='Без сигналов')
+    assert 'Без сигналов' in user_client.get(url).content.decode(), (
+        'Убедитесь, что страницы для авторизованных пользователей'
+        ' не кешируются.'
+    )
+
+
+@pytest.mark.parametrize(
+    'url', ['/', '/posts/{post.id}/', '/category/{post.category.slug}/',
+            '/profile/{post.author.username}/'],
+)
+def test_anonymous_page_invalidated_by_comment(
+        mixer, client, post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(post=post)
+    client.get(url)
+    mixer.blend('blog.Comment', post=post, text='Новый комментарий')
+    content = client.get(url).content.decode()
+    assert 'Комментарии (1)' in content or 'Новый комментарий' in content, (
+        'Убедитесь, что закешированная страница сбрасывается при добавлении'
+        ' комментария.'
+    )
+
+
+def test_anonymous_page_invalidated_by_location(
+        client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert 'Новое место' in client.get('/').content.decode(), (
+        'Убедитесь, что закешированная страница сбрасывается при изменении'
+        ' местоположения.'
+    )
+
+
+def test_feed_page_expires_at_next_publication(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend(
+        'blog.Post', category=post.category,
+        pub_date=timezone.now() + timedelta(seconds=30))
+    with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+        client.get(f'/category/{post.category.slug}/')
+    timeouts = [
+        call.args[2] for call in cache_set.call_args_list
+        if call.args[0].startswith('page:')
+    ]
+    assert timeouts and 0 < timeouts[0] <= 30, (
+        'Убедитесь, что закешированная лента истекает к моменту ближайшей'
+        ' отложенной публикации.'
+    )
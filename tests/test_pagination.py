@@ -0,0 +1,169 @@
+from datetime import timedelta
+
+import pytest
+from blog import bulk
+from blog.models import FeedCounter, Post
+from blog.paginators import (CursorPaginator, FeedPaginator, get_feed_key,
+                             get_feed_posts)
+from blog.views import get_posts
+from conftest import N_PER_PAGE
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now(),
+    )
+
+
+def test_cursor_pages_cover_feed(posts_with_same_pub_date):
+    paginator = CursorPaginator(get_posts(), N_PER_PAGE)
+    page = paginator.get_page()
+    seen = list(page)
+    assert not page.has_previous()
+    while page.has_next():
+        page = paginator.get_page(page.next_cursor)
+        seen.extend(page)
+    assert [post.pk for post in seen] == list(
+        get_posts().values_list('pk', flat=True)), (
+        'Убедитесь, что листание ленты по курсору возвращает все публикации'
+        ' по одному разу и в порядке «от новых к старым».'
+    )
+    previous_page = paginator.get_page(page.previous_cursor)
+    assert list(previous_page) == seen[N_PER_PAGE:N_PER_PAGE * 2], (
+        'Убедитесь, что курсор предыдущей страницы возвращает'
+        ' предыдущую страницу ленты.'
+    )
+
+
+def test_cursor_page_query_count(
+        posts_with_same_pub_date, django_assert_num_queries):
+    paginator = CursorPaginator(get_posts(), N_PER_PAGE)
+    cursor = paginator.get_page().next_cursor
+    with django_assert_num_queries(1):
+        len(paginator.get_page(cursor))
+
+
+def test_invalid_cursor_returns_first_page(
+        client, posts_with_same_pub_date):
+    response = client.get('/?cursor=not-a-cursor')
+    assert response.status_code == 200
+    assert list(response.context['page_obj']) == list(
+        get_posts()[:N_PER_PAGE]), (
+        'Убедитесь, что при неверном курсоре отображается первая страница'
+        ' ленты.'
+    )
+
+
+def test_numbered_page_links_next_cursor(client, posts_with_same_pub_date):
+    page_obj = client.get('/').context['page_obj']
+    response = client.get(f'/?cursor={page_obj.next_cursor}')
+    next_posts = list(response.context['page_obj'])
+    assert next_posts == list(get_posts()[N_PER_PAGE:N_PER_PAGE * 2]), (
+        'Убедитесь, что ссылка на следующую страницу ведёт к следующим'
+        ' публикациям ленты.'
+    )
+
+
+def test_feed_count_is_cached(
+        mixer, published_category, posts_with_same_pub_date,
+        django_assert_num_queries):
+    paginator = FeedPaginator(get_posts(), N_PER_PAGE, get_feed_key())
+    assert paginator.count == len(posts_with_same_pub_date)
+    with django_assert_num_queries(0):
+        assert FeedPaginator(
+            get_posts(), N_PER_PAGE, get_feed_key()
+        ).count == len(posts_with_same_pub_date), (
+            'Убедитесь, что количество публикаций ленты берётся из кеша.'
+        )
+    mixer.blend('blog.Post', category=published_category)
+    assert FeedPaginator(
+        get_posts(), N_PER_PAGE, get_feed_key()
+    ).count == len(posts_with_same_pub_date) + 1, (
+        'Убедитесь, что кешированное количество публикаций сбрасывается'
+        ' при добавлении публикации.'
+    )
+
+
+def test_feed_count_expires_at_next_publication(
+        mixer, published_category, posts_with_same_pub_date):
+    mixer.blend(
+        'blog.Post', category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30))
+    paginator = FeedPaginator(get_posts(), N_PER_PAGE, get_feed_key())
+    assert 0 < paginator.get_count_timeout() <= 30, (
+        'Убедитесь, что кешированное количество публикаций ленты истекает'
+        ' к моменту ближайшей отложенной публикации.'
+    )
+
+
+def test_approximate_feed_count_is_cached(
+        settings, posts_with_same_pub_date, published_category,
+        django_assert_num_queries):
+    settings.FEED_APPROXIMATE_COUNT = True
+    feed_key = get_feed_key(category=published_category)
+
+    def get_count():
+        return FeedPaginator(
+            get_posts(published_category.posts), N_PER_PAGE, feed_key
+        ).count
+
+    assert get_count() == len(posts_with_same_pub_date)
+    with django_assert_num_queries(0):
+        get_count()
+    posts_with_same_pub_date[0].delete()
+    assert get_count() == len(posts_with_same_pub_date) - 1, (
+        'Убедитесь, что количество публикаций ленты сбрасывается'
+        ' при удалении публикации.'
+    )
+
+
+def assert_counters_match_posts():
+    counters = dict(FeedCounter.objects.values_list('key', 'count'))
+    assert counters == {
+        key: get_feed_posts(key).count() for key in counters
+    }, (
+        'Убедитесь, что счётчики лент обновляются при удалении'
+        ' и снятии с публикации, переносе публикаций и изменении'
+        ' категорий.'
+    )
+
+
+def test_feed_counters_follow_writes(mixer, make_posts, published_category):
+    other_category = mixer.blend('blog.Category', is_published=True)
+    posts = make_posts(4)
+    make_posts(1, pub_date=timezone.now() + timedelta(days=1))
+    assert_counters_match_posts()
+    posts[0].delete()
+    assert_counters_match_posts()
+    bulk.set_published(Post.objects.filter(pk=posts[1].pk), False)
+    assert_counters_match_posts()
+    bulk.move_to_category(
+        Post.objects.filter(pk=posts[2].pk), other_category)
+    assert_counters_match_posts()
+    other_category.is_published = False
+    other_category.save()
+    assert_counters_match_posts()
+    published_category.delete()
+    assert_counters_match_posts()
+
+
+def test_approximate_feed_count_reads_counter(
+        settings, make_posts, published_category):
+    settings.FEED_APPROXIMATE_COUNT = True
+    make_posts(3)
+    make_posts(1, pub_date=timezone.now() + timedelta(days=1))
+    feed_key = get_feed_key(category=published_category)
+    assert FeedCounter.objects.get(key=feed_key).count == 4
+    paginator = FeedPaginator(
+        get_posts(published_category.posts), N_PER_PAGE, feed_key)
+    assert paginator.get_count() == 3, (
+        'Убедитесь, что в режиме приблизительного подсчёта количество'
+        ' публикаций берётся из счётчика ленты без отложенных публикаций.'
+    )
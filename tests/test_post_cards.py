@@ -0,0 +1,31 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_is_cached_and_invalidated(
+        client, post_with_published_location):
+    post = post_with_published_location
+    category = post.category
+    assert category.title in client.get('/').content.decode()
+    type(category).objects.filter(pk=category.pk).update(title='Устарело')
+    assert 'Устарело' not in client.get('/').content.decode(), (
+        'Убедитесь, что карточка публикации берётся из кеша фрагментов.'
+    )
+    category.title = 'Обновлено'
+    category.save()
+    assert 'Обновлено' in client.get('/').content.decode(), (
+        'Убедитесь, что кеш карточки публикации сбрасывается при изменении'
+        ' категории.'
+    )
+
+
+def test_post_card_shows_new_comment_count(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    assert 'Комментарии (0)' in client.get('/').content.decode()
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in client.get('/').content.decode(), (
+        'Убедитесь, что кеш карточки публикации сбрасывается при добавлении'
+        ' комментария.'
+    )
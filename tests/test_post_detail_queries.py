@@ -0,0 +1,27 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(5).blend('blog.Comment', post=post_with_published_location)
+    return post_with_published_location
+
+
+@pytest.mark.parametrize(
+    ('client_fixture', 'n_queries'),
+    [('user_client', 5), ('another_user_client', 5), ('client', 4)],
+    ids=['author', 'visitor', 'anonymous'],
+)
+def test_post_detail_query_count(
+        request, mixer, commented_post, django_assert_num_queries,
+        client_fixture, n_queries):
+    client = request.getfixturevalue(client_fixture)
+    url = f'/posts/{commented_post.id}/'
+    with django_assert_num_queries(n_queries):
+        client.get(url)
+    mixer.cycle(5).blend('blog.Comment', post=commented_post)
+    with django_assert_num_queries(n_queries):
+        response = client.get(url + '?more')
+    assert response.status_code == 200
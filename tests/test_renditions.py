@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from blog.images import RENDITION_WIDTHS
+from blog.models import PostImageRendition
+from django.core.management import call_command
+from fixtures.images import post_form_data
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_create_post_generates_renditions(
+        user_client, published_category, make_image_upload):
+    user_client.post('/posts/create/', data=post_form_data(
+        published_category, make_image_upload(size=(3000, 1500)),
+        title='С картинкой'))
+    renditions = PostImageRendition.objects.filter(
+        post__title='С картинкой')
+    assert {
+        (rendition.kind, rendition.format, rendition.width, rendition.height)
+        for rendition in renditions
+    } == {
+        (kind, image_format, width, width // 2)
+        for kind, width in RENDITION_WIDTHS.items()
+        for image_format in (PostImageRendition.JPEG, PostImageRendition.WEBP)
+    }, (
+        'Убедитесь, что при создании публикации с изображением создаются'
+        ' уменьшенные копии в форматах JPEG и WebP.'
+    )
+    content = user_client.get('/').content.decode()
+    card = renditions.get(
+        kind=PostImageRendition.CARD, format=PostImageRendition.JPEG)
+    assert f'src="{card.image.url}"' in content
+    assert 'srcset=' in content and 'width="640"' in content, (
+        'Убедитесь, что карточка публикации выводит srcset и размеры'
+        ' изображения.'
+    )
+
+
+def test_generate_renditions_command(post_with_published_location):
+    call_command('generate_renditions', workers=1, stdout=StringIO())
+    assert post_with_published_location.renditions.count() == len(
+        RENDITION_WIDTHS) * 2, (
+        'Убедитесь, что команда `generate_renditions` создаёт копии'
+        ' изображений для существующих публикаций.'
+    )
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1] / 'blogicum'
+
+# Основная база и реплика — два файла SQLite. Репликацию изображает
+# копирование основной базы; после него реплика отстаёт от записей.
+SCENARIO = '''
+import json, sqlite3, sys
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from blog.models import Category, Post, User
+from blogicum.routers import PIN_CACHE_KEY, PIN_COOKIE, pinned_until
+
+primary, replica = sys.argv[1:]
+setup_test_environment()
+call_command('migrate', verbosity=0)
+category = Category.objects.create(title='c', description='c', slug='c')
+author = User.objects.create(username='author')
+post = Post.objects.create(
+    title='С основной базы', text='Текст', pub_date=timezone.now(),
+    author=author, category=category)
+author_client = Client()
+author_client.force_login(author)
+
+
+def copy_primary_to_replica():
+    connections.close_all()
+    with sqlite3.connect(primary) as source, \
+            sqlite3.connect(replica) as target:
+        source.backup(target)
+        target.execute(
+            "UPDATE blog_post SET title = 'С реплики' WHERE id = ?",
+            (post.id,))
+
+
+copy_primary_to_replica()
+# Реплика догнала основную базу, окно отставания прошло.
+cache.delete(PIN_CACHE_KEY)
+pinned_until.set(0.0)
+
+url = f'/posts/{post.id}/'
+results = {'anonymous_reads_replica': 'С реплики' in Client().get(
+    url).content.decode()}
+response = author_client.post(
+    f'/posts/{post.id}/comment/', {'text': 'Свежий комментарий'})
+results['pin_cookie'] = PIN_COOKIE in response.cookies
+content = author_client.get(url).content.decode()
+results['author_sees_comment'] = 'Свежий комментарий' in content
+results['author_reads_primary'] = 'С основной базы' in content
+content = Client().get(url).content.decode()
+results['reader_reads_replica_after_write'] = 'С реплики' in content
+results['reader_sees_stale_replica'] = 'Свежий комментарий' not in content
+copy_primary_to_replica()
+results['reader_sees_comment_after_catch_up'] = (
+    'Свежий комментарий' in Client().get(url).content.decode())
+results['feed_pins_primary'] = PIN_COOKIE in Client().get('/').cookies
+print(json.dumps(results))
+'''
+
+
+def test_reads_go_to_replica_with_read_your_writes(tmp_path):
+    primary = tmp_path / 'primary.sqlite3'
+    replica = tmp_path / 'replica.sqlite3'
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='blogicum.settings.test',
+        SQLITE_PATH=str(primary),
+        DB_REPLICAS=str(replica),
+    )
+    results = json.loads(subprocess.run(
+        [sys.executable, '-c', SCENARIO, str(primary), str(replica)],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout)
+    assert results['anonymous_reads_replica'], (
+        'Убедитесь, что страницы для чтения обращаются к реплике.'
+    )
+    assert results['pin_cookie']
+    assert results['author_sees_comment'] and results['author_reads_primary'], (
+        'Убедитесь, что после записи автор читает с основной базы'
+        ' и видит свой комментарий.'
+    )
+    assert (
+        results['reader_reads_replica_after_write']
+        and results['reader_sees_stale_replica']
+    ), (
+        'Убедитесь, что запись не переводит чтение остальных посетителей'
+        ' на основную базу.'
+    )
+    assert results['reader_sees_comment_after_catch_up'], (
+        'Убедитесь, что сразу после записи прочитанное с отстающей'
+        ' реплики не сохраняется в кеш страниц.'
+    )
+    assert not results['feed_pins_primary'], (
+        'Убедитесь, что чтение ленты не пишет в базу данных.'
+    )
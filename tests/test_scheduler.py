@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import scheduler as blog_scheduler
+from blog.scheduler import PublicationScheduler, post_became_visible
+
+pytestmark = [pytest.mark.django_db]
+
+
+class FrozenClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FrozenClock(timezone.now().replace(microsecond=0))
+    monkeypatch.setattr(timezone, 'now', clock)
+    return clock
+
+
+@pytest.fixture
+def make_post(make_posts, clock):
+    def make_post(**delta):
+        post, = make_posts(1, pub_date=clock.now + timedelta(**delta))
+        return post
+    return make_post
+
+
+@pytest.fixture
+def announced():
+    announced = []
+
+    def receiver(sender, rows, **kwargs):
+        announced.extend(rows)
+
+    post_became_visible.connect(receiver, weak=False)
+    yield announced
+    post_became_visible.disconnect(receiver)
+
+
+def get_feed_ids(client, url='/'):
+    return [post.id for post in client.get(url).context['page_obj']]
+
+
+def test_scheduler_announces_posts_at_pub_date(
+        client, clock, make_post, announced):
+    scheduler = PublicationScheduler(clock)
+    visible = make_post(hours=-1)
+    scheduled = make_post(minutes=10)
+    later = make_post(hours=2)
+    assert scheduler.tick() == 0
+    assert scheduler.next_run() == scheduled.pub_date, (
+        'Убедитесь, что планировщик знает время ближайшей публикации.'
+    )
+    assert scheduler.get_sleep(3600) == 600
+    assert get_feed_ids(client) == [visible.id]
+
+    clock.advance(minutes=5)
+    assert scheduler.tick() == 0
+    clock.advance(minutes=5)
+    assert scheduler.tick() == 1
+    assert [row[0] for row in announced] == [scheduled.id], (
+        'Убедитесь, что планировщик объявляет публикацию видимой'
+        ' в момент наступления её даты.'
+    )
+    assert get_feed_ids(client) == [scheduled.id, visible.id], (
+        'Убедитесь, что объявление публикации сбрасывает кеш ленты.'
+    )
+    assert client.get('/').context is None, (
+        'Убедитесь, что лента снова кешируется после объявления.'
+    )
+    assert scheduler.tick() == 0, (
+        'Убедитесь, что публикация объявляется только один раз.'
+    )
+    assert scheduler.next_run() == later.pub_date
+
+
+def test_scheduler_catches_up_after_restart(clock, make_post, announced):
+    PublicationScheduler(clock).tick()
+    posts = [make_post(minutes=minutes) for minutes in (1, 2, 3)]
+    clock.advance(hours=1)
+    assert PublicationScheduler(clock).tick() == 3
+    assert {row[0] for row in announced} == {post.id for post in posts}
+
+
+def test_scheduler_resumes_after_failed_batch(clock, make_post, announced):
+    scheduler = PublicationScheduler(clock)
+    scheduler.batch_size = 2
+    scheduler.tick()
+    posts = [make_post(minutes=minutes) for minutes in (1, 2, 3, 4, 5)]
+    clock.advance(hours=1)
+    failures = []
+
+    def fail_once(sender, rows, **kwargs):
+        if len(announced) > 2 and not failures:
+            failures.append(rows)
+            raise RuntimeError('Сбой при объявлении')
+
+    post_became_visible.connect(fail_once, weak=False)
+    try:
+        with pytest.raises(RuntimeError):
+            scheduler.tick()
+    finally:
+        post_became_visible.disconnect(fail_once)
+    first_run = {row[0] for row in announced}
+    assert first_run == {post.id for post in posts[:4]}
+    announced.clear()
+    scheduler.tick()
+    assert {row[0] for row in announced} >= {
+        post.id for post in posts[2:]}, (
+        'Убедитесь, что после сбоя планировщик объявляет публикации'
+        ' пачки, на которой произошёл сбой.'
+    )
+    assert posts[0].id not in {row[0] for row in announced}, (
+        'Убедитесь, что планировщик сохраняет прогресс после каждой пачки.'
+    )
+
+
+def test_wait_notices_publication_scheduled_meanwhile(
+        clock, make_post, monkeypatch):
+    scheduler = PublicationScheduler(clock)
+    slept = []
+
+    def sleep(seconds):
+        if not slept:
+            make_post(seconds=2)
+        slept.append(seconds)
+        clock.advance(seconds=seconds)
+
+    monkeypatch.setattr(blog_scheduler.time, 'sleep', sleep)
+    scheduler.wait(60)
+    assert sum(slept) <= 2, (
+        'Убедитесь, что планировщик просыпается к публикации,'
+        ' отложенной во время ожидания, а не через max_sleep.'
+    )
+
+
+def test_next_publication_is_cached(client, clock, make_post):
+    make_post(hours=-1)
+    make_post(minutes=10)
+    client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/', {'page': 1})
+    assert not any(
+        'MIN(' in query['sql'] for query in queries.captured_queries), (
+        'Убедитесь, что время ближайшей публикации берётся из кеша,'
+        ' а не считается на каждый запрос.'
+    )
+
+
+def test_run_scheduler_command(clock, make_post, announced):
+    call_command('run_scheduler', once=True, stdout=StringIO())
+    post = make_post(seconds=30)
+    clock.advance(minutes=1)
+    stdout = StringIO()
+    call_command('run_scheduler', once=True, stdout=stdout)
+    assert [row[0] for row in announced] == [post.id]
+    assert 'Опубликовано по расписанию: 1' in stdout.getvalue()
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import post_index, search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(make_posts, user):
+    def make_post(title, text='', **fields):
+        post, = make_posts(1, author=user, title=title, text=text, **fields)
+        return post
+    return make_post
+
+
+def get_result_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_ranks_title_above_text_and_comments(
+        client, mixer, make_post):
+    in_text = make_post('Заметка', 'Поход в горы на выходных')
+    in_title = make_post('Горы Алтая', 'Маршрут и снаряжение')
+    in_comment = make_post('Без совпадений', 'Совсем о другом')
+    make_post('Лишняя', 'Про море')
+    mixer.blend('blog.Comment', post=in_comment, text='А я был в горах')
+    assert get_result_ids(client, 'гор') == [
+        in_title.id, in_text.id, in_comment.id], (
+        'Убедитесь, что поиск находит публикации по заголовку, тексту'
+        ' и комментариям и ставит совпадения в заголовке выше.'
+    )
+
+
+def test_search_respects_visibility(
+        client, user, user_client, make_post):
+    published = make_post('Ранний рассвет')
+    draft = make_post('Рассвет в черновике', is_published=False)
+    scheduled = make_post(
+        'Рассвет завтра', pub_date=timezone.now() + timedelta(days=1))
+    assert get_result_ids(client, 'рассвет') == [published.id], (
+        'Убедитесь, что поиск не показывает неопубликованные'
+        ' и отложенные публикации.'
+    )
+    assert set(get_result_ids(user_client, 'рассвет')) == {
+        published.id, draft.id, scheduled.id}, (
+        'Убедитесь, что автор находит в поиске свои неопубликованные'
+        ' публикации.'
+    )
+
+
+def test_index_follows_saves_and_deletes(client, mixer, make_post):
+    post = make_post('Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert get_result_ids(client, 'старый') == []
+    assert get_result_ids(client, 'новый') == [post.id], (
+        'Убедитесь, что индекс обновляется при сохранении публикации.'
+    )
+    comment = mixer.blend('blog.Comment', post=post, text='Яблоки')
+    assert get_result_ids(client, 'яблоки') == [post.id]
+    comment.delete()
+    assert get_result_ids(client, 'яблоки') == [], (
+        'Убедитесь, что индекс обновляется при удалении комментария.'
+    )
+    post.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {post_index.table}')
+        assert cursor.fetchone()[0] == 0, (
+            'Убедитесь, что удалённые публикации убираются из индекса.'
+        )
+
+
+def test_search_pages_by_cursor(client, make_post):
+    posts = [make_post(f'Пост про кошек {number}') for number in range(25)]
+    response = client.get('/search/', {'q': 'кошек'})
+    ids = [post.id for post in response.context['page_obj']]
+    page = response.context['page_obj']
+    while page.has_next():
+        page = client.get(
+            '/search/', {'q': 'кошек', 'cursor': page.next_cursor}
+        ).context['page_obj']
+        ids.extend(post.id for post in page)
+    assert sorted(ids) == sorted(post.id for post in posts), (
+        'Убедитесь, что курсорная пагинация поиска выдаёт каждую'
+        ' публикацию ровно один раз.'
+    )
+    assert ids == [
+        post.id for post in search_posts(Post.objects, 'кошек')
+        .order_by('-search_rank', '-pk')
+    ]
+
+
+def test_search_ignores_query_syntax(client, make_post):
+    post = make_post('Кавычки и звёздочки')
+    assert get_result_ids(client, '"кавычки* (') == [post.id]
+    assert client.get('/search/', {'q': '"*()'}).status_code == 200
+
+
+def test_admin_search_uses_index(mixer, make_post):
+    post = make_post('Индексированный заголовок')
+    make_post('Другой заголовок')
+    comment = mixer.blend('blog.Comment', post=post, text='Особый отзыв')
+    admin = get_user_model().objects.create_superuser(
+        'admin', 'admin@example.com', 'password')
+    client = Client()
+    client.force_login(admin)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            '/admin/blog/post/', {'q': 'индексированный'})
+    assert list(response.context['cl'].result_list) == [post]
+    assert not any(
+        'LIKE' in query['sql'] for query in queries.captured_queries), (
+        'Убедитесь, что поиск в админке использует полнотекстовый индекс.'
+    )
+    response = client.get('/admin/blog/comment/', {'q': 'особый'})
+    assert list(response.context['cl'].result_list) == [comment]
+
+
+def test_rebuild_search_index(make_post):
+    post = make_post('Перестроенный индекс')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {post_index.table}')
+    stdout = StringIO()
+    call_command('rebuild_search_index', batch_size=2, stdout=stdout)
+    assert list(search_posts(Post.objects, 'перестроенный')) == [post], (
+        'Убедитесь, что команда `rebuild_search_index` заполняет индекс.'
+    )
+    assert 'blog.Post: проиндексировано 1' in stdout.getvalue()
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_cleanup_sessions_deletes_expired_in_batches():
+    now = timezone.now()
+    Session.objects.bulk_create(
+        Session(session_key=f'expired{number}', session_data='',
+                expire_date=now - timedelta(days=1))
+        for number in range(5)
+    )
+    Session.objects.create(
+        session_key='active', session_data='',
+        expire_date=now + timedelta(days=1))
+    stdout = StringIO()
+    call_command('cleanup_sessions', batch_size=2, stdout=stdout)
+    assert list(Session.objects.values_list('session_key', flat=True)) == [
+        'active'], (
+        'Убедитесь, что команда `cleanup_sessions` удаляет только'
+        ' истёкшие сессии.'
+    )
+    assert 'Удалено сессий: 5' in stdout.getvalue()
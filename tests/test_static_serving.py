@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStaticFilesStorage')
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_base_template_uses_local_bootstrap(client):
+    content = client.get('/').content.decode()
+    assert '/static/css/bootstrap.min' in content
+    assert 'cdn.jsdelivr.net' not in content, (
+        'Убедитесь, что Bootstrap подключается из статики проекта.'
+    )
+    with open(finders.find('css/bootstrap.min.css'), 'rb') as css:
+        header = css.read(100).decode()
+    assert 'Bootstrap  v5.2.' in header, (
+        'Убедитесь, что в статике проекта лежит Bootstrap 5.2,'
+        ' который раньше подключался с CDN.'
+    )
+
+
+def test_collectstatic_precompresses_hashed_files(collected_static):
+    name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    assert name != 'css/bootstrap.min.css'
+    assert (collected_static / f'{name}.gz').exists(), (
+        'Убедитесь, что collectstatic сохраняет сжатые копии файлов.'
+    )
+
+
+def test_hashed_static_is_served_compressed_and_immutable(
+        client, collected_static):
+    url = staticfiles_storage.url('css/bootstrap.min.css')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что статика отдаётся через FileResponse.'
+    )
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body.startswith(b'@charset')
+
+    plain = client.get(url)
+    assert not plain.has_header('Content-Encoding')
+
+    not_modified = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    assert not_modified.status_code == 304
+
+
+def test_unhashed_static_has_short_max_age(settings, client, collected_static):
+    response = client.get('/static/css/bootstrap.min.css')
+    assert response.status_code == 200
+    assert response['Cache-Control'] == (
+        f'public, max-age={settings.STATIC_MAX_AGE}')
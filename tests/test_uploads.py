@@ -0,0 +1,109 @@
+import hashlib
+import struct
+
+import pytest
+from blog.models import Post
+from blog.uploads import PostImageUploadHandler, stream_image_uploads
+from django.core.files.uploadhandler import StopFutureHandlers, StopUpload
+from django.test import RequestFactory
+from fixtures.images import image_bytes, post_form_data
+
+pytestmark = [pytest.mark.django_db]
+
+
+def post_image(client, category, upload, **fields):
+    return client.post(
+        '/posts/create/', data=post_form_data(category, upload, **fields))
+
+
+@pytest.mark.parametrize(
+    ('content', 'limits'),
+    [
+        (image_bytes((300, 300)), {'POST_IMAGE_MAX_SIZE': 100}),
+        (image_bytes((20000, 20000), '1', 'PNG'), {}),
+        (b'not an image' * 10, {}),
+    ],
+    ids=['size', 'pixels', 'not-image'],
+)
+def test_upload_is_rejected(
+        settings, user_client, published_category, make_image_upload,
+        content, limits):
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    response = post_image(
+        user_client, published_category, make_image_upload(content))
+    assert response.status_code == 200
+    assert response.context['form'].errors.get('image'), (
+        'Убедитесь, что слишком большие файлы и файлы, которые не являются'
+        ' изображениями, отклоняются с ошибкой в форме.'
+    )
+    assert not Post.objects.exists()
+
+
+def test_decompression_bomb_is_rejected_on_first_chunk():
+    content = image_bytes((20000, 20000), '1', 'PNG')
+    handler = PostImageUploadHandler(RequestFactory().post('/'))
+    with pytest.raises(StopFutureHandlers):
+        handler.new_file('image', 'bomb.png', 'image/png', len(content))
+    with pytest.raises(StopUpload):
+        handler.receive_data_chunk(content[:1024], 0)
+    assert handler.error, (
+        'Убедитесь, что загрузка прерывается по заголовку изображения,'
+        ' не дожидаясь конца файла.'
+    )
+    upload = handler.file_complete(len(content))
+    assert upload.upload_error == handler.error
+
+
+def test_jpeg_with_large_metadata_is_accepted(
+        user_client, published_category, make_image_upload):
+    content = image_bytes((400, 300))
+    # Два сегмента APP1 по 64 КБ отодвигают SOF за первый фрагмент.
+    metadata = b''.join(
+        b'\xff\xe1' + struct.pack('>H', 65535) + bytes(65533)
+        for _ in range(2))
+    post_image(user_client, published_category, make_image_upload(
+        content[:2] + metadata + content[2:]))
+    assert Post.objects.exists(), (
+        'Убедитесь, что фотографии с большими метаданными EXIF'
+        ' не отклоняются как не изображения.'
+    )
+
+
+def test_oversized_upload_stops_reading_body(settings, make_image_upload):
+    settings.POST_IMAGE_MAX_SIZE = 1024
+    request = RequestFactory().post('/posts/create/', data={
+        'image': make_image_upload(image_bytes() + bytes(1024 * 1024)),
+        'title': 'После файла',
+    })
+    request._dont_enforce_csrf_checks = True
+
+    @stream_image_uploads
+    def view(request):
+        return request
+
+    request = view(request)
+    assert request.FILES['image'].upload_error
+    assert request._stream.remaining > 0, (
+        'Убедитесь, что после отклонения файла остаток тела запроса'
+        ' не читается.'
+    )
+
+
+def test_identical_images_share_one_file(
+        user_client, published_category, make_image_upload):
+    content = image_bytes()
+    for title in ('Первая', 'Вторая'):
+        post_image(
+            user_client, published_category, make_image_upload(content),
+            title=title)
+    first, second = Post.objects.order_by('pk')
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые изображения сохраняются в один файл.'
+    )
+    with first.image.open('rb') as image_file:
+        digest = hashlib.sha256(image_file.read()).hexdigest()
+    assert digest in first.image.name
+    storage = first.image.storage
+    _, files = storage.listdir(first.image.name.rsplit('/', 1)[0])
+    assert files == [first.image.name.rsplit('/', 1)[1]]